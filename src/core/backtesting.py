@@ -0,0 +1,156 @@
+import pandas as pd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Mapping, Sequence, Union
+from src.core.forecasting import ForecastEngine, WARM_START_MAX_NEW
+from src.models.forecast_schemas import ForecastInput
+
+# Seasonal lag of the naive benchmark used to scale MASE
+MASE_SEASONALITY = 12
+
+class BacktestEngine:
+    """
+    Rolling-origin cross-validation of ForecastEngine.generate_forecast.
+    For each series, models are trained on history up to a cutoff and scored
+    on the months that follow, for every cutoff from `initial` onward.
+    """
+
+    @staticmethod
+    def cutoffs(n_obs: int, initial: int = 24, step: int = 1) -> List[int]:
+        """
+        Training lengths of each fold: initial, initial + step, ... while at least
+        one month is left to score.
+        """
+        if initial < 1 or step < 1:
+            raise ValueError("initial and step must be positive")
+        return list(range(initial, n_obs, step))
+
+    @staticmethod
+    def run_backtest(
+        inputs: Union[Mapping[str, ForecastInput], Sequence[ForecastInput]],
+        horizon: int = 12,
+        initial: int = 24,
+        step: int = 1,
+        window: str = "expanding",
+        max_workers: int = None,
+        detail: bool = False
+    ) -> pd.DataFrame:
+        """
+        Backtests many series in parallel (one process task per series).
+        - window='expanding': every fold trains on all months before the cutoff. Adjacent
+          folds then differ by `step` appended months, so with step <= WARM_START_MAX_NEW
+          each fold warm-starts from the previous fold's fit.
+        - window='sliding': every fold trains on the last `initial` months (always a full refit).
+        Each ForecastInput supplies the history and model settings; its horizon is replaced.
+        The last folds score fewer than `horizon` months if the series ends first.
+        Folds that fail to fit are skipped.
+
+        Returns a tidy DataFrame, one row per (series, horizon):
+            series, horizon, n_cutoffs, mae, mape (%), smape (%), mase
+        With detail=True, one row per scored month instead:
+            series, cutoff, horizon, actual, forecast
+        MAPE ignores months with zero actuals. MASE divides by the in-sample MAE of a
+        seasonal-naive forecast on the fold's training window (lag 1 if shorter than two seasons).
+        """
+        if window not in ("expanding", "sliding"):
+            raise ValueError(f"Unknown window '{window}'")
+        if horizon < 1:
+            raise ValueError("horizon must be positive")
+
+        named = list(inputs.items()) if isinstance(inputs, Mapping) else list(enumerate(inputs))
+        tasks = [(name, input_data, horizon, initial, step, window) for name, input_data in named]
+
+        if max_workers == 1:
+            frames = [_backtest_series(*task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                frames = list(pool.map(_backtest_series, *zip(*tasks))) if tasks else []
+
+        errors = pd.concat(frames, ignore_index=True) if frames else _empty_detail()
+        if detail:
+            return errors[["series", "cutoff", "horizon", "actual", "forecast"]]
+        return BacktestEngine.summarize(errors)
+
+    @staticmethod
+    def summarize(errors: pd.DataFrame) -> pd.DataFrame:
+        """
+        Aggregates per-month backtest rows (see run_backtest detail) into per (series, horizon) metrics.
+        """
+        abs_error = (errors["actual"] - errors["forecast"]).abs()
+        actual_abs = errors["actual"].abs()
+        scored = errors.assign(
+            abs_error=abs_error,
+            ape=(abs_error / actual_abs).where(actual_abs > 0) * 100,
+            sape=(2 * abs_error / (actual_abs + errors["forecast"].abs())).fillna(0.0) * 100,
+            scaled_error=abs_error / errors["mase_scale"]
+        )
+        summary = scored.groupby(["series", "horizon"], sort=True).agg(
+            n_cutoffs=("cutoff", "size"),
+            mae=("abs_error", "mean"),
+            mape=("ape", "mean"),
+            smape=("sape", "mean"),
+            mase=("scaled_error", "mean")
+        )
+        return summary.reset_index()
+
+def _mase_scale(train: np.ndarray) -> float:
+    lag = MASE_SEASONALITY if train.size >= 2 * MASE_SEASONALITY else 1
+    if train.size <= lag:
+        return np.nan
+    scale = np.mean(np.abs(train[lag:] - train[:-lag]))
+    return scale if scale > 0 else np.nan
+
+def _empty_detail() -> pd.DataFrame:
+    return pd.DataFrame(columns=["series", "cutoff", "horizon", "actual", "forecast", "mase_scale"])
+
+def _backtest_series(name, input_data: ForecastInput, horizon: int, initial: int, step: int, window: str) -> pd.DataFrame:
+    """
+    Worker task: all folds of one series, in cutoff order so expanding folds can warm-start.
+    Fixed-mode folds are fitted here, each from the previous fold's fit, rather than
+    through FIT_CACHE: the result never depends on what the process fitted before.
+    """
+    series = ForecastEngine.preprocess_data(input_data.dates, input_data.values)
+    dates = [d.strftime('%Y-%m-%d') for d in series.index]
+    values = series.to_numpy(dtype=float)
+    warm_start = window == "expanding" and step <= WARM_START_MAX_NEW and input_data.engine == "statsmodels"
+
+    rows = []
+    previous_fit = None
+    for cutoff in BacktestEngine.cutoffs(len(values), initial, step):
+        start = cutoff - initial if window == "sliding" else 0
+        steps = min(horizon, len(values) - cutoff)
+        train = series.iloc[start:cutoff]
+        fold = input_data.model_copy(update=dict(
+            dates=dates[start:cutoff],
+            values=values[start:cutoff].tolist(),
+            periods=steps,
+            warm_start=False,
+            # Point forecasts only: skip path simulation
+            interval_method='constant'
+        ))
+        try:
+            fit = None
+            if input_data.seasonality_mode != 'auto':
+                fit = _fold_fit(train, input_data, previous_fit if warm_start else None)
+            output = ForecastEngine.generate_forecast(fold, series=train, fit=fit)
+        except Exception:
+            previous_fit = None
+            continue
+        previous_fit = fit
+
+        scale = _mase_scale(values[start:cutoff])
+        for h in range(steps):
+            rows.append((name, series.index[cutoff - 1], h + 1, values[cutoff + h], output.forecast_values[h], scale))
+
+    if not rows:
+        return _empty_detail()
+    return pd.DataFrame(rows, columns=["series", "cutoff", "horizon", "actual", "forecast", "mase_scale"])
+
+def _fold_fit(train: pd.Series, input_data: ForecastInput, previous_fit=None):
+    # Warm start from the previous fold when it is a strict prefix of this one, else a full fit
+    if input_data.engine == "numpy":
+        return ForecastEngine.fit_holt_winters_numpy(train, input_data.seasonality_mode)
+    if previous_fit is not None and 0 < len(train) - int(previous_fit.model.nobs) <= WARM_START_MAX_NEW:
+        fit, _ = ForecastEngine.update_fitted_model(previous_fit, train, input_data.seasonality_mode)
+        return fit
+    return ForecastEngine.fit_holt_winters(train, input_data.seasonality_mode)
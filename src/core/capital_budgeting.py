@@ -1,6 +1,21 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import List, Sequence
 import numpy as np
 import numpy_financial as npf
-from src.models.project_schemas import ProjectInput
+from scipy.signal import lfilter
+from scipy.stats import norm, qmc
+from src.models.project_schemas import ProjectInput, HistogramBins
+from src.core.streaming_stats import StreamingSummary
+
+MONTE_CARLO_METHODS = ("standard", "antithetic", "control_variate", "sobol")
+
+# Independent scrambles used to estimate the error of randomized QMC
+SOBOL_REPLICATES = 8
+
+# Half-width (in std) of the streamed NPV histogram shown to users
+DISPLAY_STD_RANGE = 4
 
 class CapitalBudgetingEngine:
     
@@ -16,36 +31,12 @@ class CapitalBudgetingEngine:
         # NPV
         npv = npf.npv(project.discount_rate, cf_array)
         
-        # IRR
-        try:
-            irr = npf.irr(cf_array)
-            if np.isnan(irr):
-                irr = 0.0
-        except:
-            irr = 0.0
+        # IRR (NaN when no root is found, see irr_converged)
+        irr_result = CapitalBudgetingEngine.calculate_irr_batch(cf_array[None, :])
+        irr = irr_result["irr"][0]
             
-        # Payback Period
-        cumulative_cf = np.cumsum(cf_array)
-        # Find first index where cumulative >= 0
-        # If never positive, payback is undefined (or > lifespan)
-        payback_idx = np.where(cumulative_cf >= 0)[0]
-        
-        if len(payback_idx) > 0:
-            # We want exact year. Simple linear interpolation is better but integer year is often accepted MVP.
-            # Let's do integer year for safety/simplicity first.
-            # Index 0 is Year 0.
-            p_year = payback_idx[0]
-            # Refinement: Fraction of year
-            # Year before recovery: p_year - 1
-            # Amount left to recover: abs(cumulative_cf[p_year-1])
-            # Cash flow in recovery year: cf_array[p_year]
-            if p_year > 0:
-                fraction = abs(cumulative_cf[p_year-1]) / cf_array[p_year]
-                payback = (p_year - 1) + fraction
-            else:
-                payback = 0.0 # Instant payback?
-        else:
-            payback = float('inf') # Never pays back
+        # Payback Period (fractional year, inf if never recovered)
+        payback = CapitalBudgetingEngine.calculate_payback_batch(cf_array[None, :])[0]
         
         # Profitability Index (PI) = PV of Future / Initial Investment
         # PV of Future
@@ -59,17 +50,159 @@ class CapitalBudgetingEngine:
         return {
             "npv": float(npv),
             "irr": float(irr),
+            "irr_converged": bool(irr_result["converged"][0]),
             "payback": float(payback),
             "pi": float(pi)
         }
 
     @staticmethod
-    def run_monte_carlo(project: ProjectInput, iterations: int = 5000) -> dict:
+    def calculate_payback_batch(cash_flows: np.ndarray) -> np.ndarray:
+        """
+        Vectorized fractional payback period, one stream per row (year 0 first).
+        Payback = (year before recovery) + (amount left to recover / cash flow in recovery year).
+        Rows that never recover get inf.
+        """
+        cf = np.atleast_2d(np.asarray(cash_flows, dtype=float))
+        rows = np.arange(cf.shape[0])
+        cumulative_cf = np.cumsum(cf, axis=1)
+
+        # First index where cumulative >= 0 (argmax returns 0 when never recovered)
+        recovered = cumulative_cf >= 0
+        p_year = np.argmax(recovered, axis=1)
+        ever = recovered[rows, p_year]
+
+        prev_year = np.maximum(p_year - 1, 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fraction = np.abs(cumulative_cf[rows, prev_year]) / cf[rows, p_year]
+        payback = np.where(p_year > 0, prev_year + fraction, 0.0)
+        return np.where(ever, payback, np.inf)
+
+    # Rates scanned for a sign change of NPV(r) before refining each row: 1% steps up to 100%
+    # (two roots rarely share a cell), then coarse points out to very large roots (e.g. [-100, 1e6])
+    IRR_BRACKET_GRID = np.concatenate([
+        np.linspace(-0.99, 1.0, 200),
+        [1.5, 2.0, 3.0, 5.0, 10.0, 100.0, 1e3, 1e4, 1e5, 1e6, 1e8]
+    ])
+
+    @staticmethod
+    def calculate_irr_batch(cash_flows: np.ndarray, tol: float = 1e-10, max_iter: int = 100) -> dict:
+        """
+        Vectorized IRR for a 2-D matrix of cash-flow streams (one project per row, year 0 first).
+        Newton steps safeguarded by bisection inside a per-row sign-change bracket.
+        Rows with several roots resolve to the lowest non-negative root where one exists.
+        Output: dict of arrays
+            'irr'        - rate per row (NaN if not converged)
+            'converged'  - bool per row
+            'status'     - 'converged' | 'no_sign_change' (no bracket on the rate grid) | 'max_iter'
+                           | 'zero_cash_flows' (every rate is a root: no IRR)
+            'iterations' - Newton/bisection steps used per row
+        """
+        cf = np.atleast_2d(np.asarray(cash_flows, dtype=float))
+        n_rows, n_periods = cf.shape
+        t = np.arange(n_periods)
+        scale = np.maximum(np.abs(cf).sum(axis=1), 1e-300)
+
+        # 1. Bracket: NPV on the rate grid, (n_rows, n_grid)
+        grid = CapitalBudgetingEngine.IRR_BRACKET_GRID
+        # Long streams overflow at the most negative rates: those grid points give no bracket
+        with np.errstate(over='ignore', invalid='ignore'):
+            npv_grid = cf @ ((1 + grid[None, :]) ** -t[:, None])
+        finite = np.isfinite(npv_grid)
+        sign_change = (np.sign(npv_grid[:, :-1]) * np.sign(npv_grid[:, 1:]) <= 0) & finite[:, :-1] & finite[:, 1:]
+        degenerate = ~np.any(cf != 0, axis=1)
+        sign_change[degenerate] = False
+
+        # Several brackets: prefer the lowest non-negative rate, then the negative one closest to 0%
+        lo_grid, hi_grid = grid[:-1], grid[1:]
+        distance = np.where(hi_grid > 0, np.maximum(lo_grid, 0.0), grid[-1] + 1.0 - hi_grid)
+        bracket = np.argmin(np.where(sign_change, distance[None, :], np.inf), axis=1)
+        has_root = sign_change[np.arange(n_rows), bracket]
+
+        lo = lo_grid[bracket].copy()
+        hi = hi_grid[bracket].copy()
+        f_lo = npv_grid[np.arange(n_rows), bracket]
+
+        irr = np.full(n_rows, np.nan)
+        converged = np.zeros(n_rows, dtype=bool)
+        iterations = np.zeros(n_rows, dtype=np.int64)
+
+        # 2. Refine only the rows that are still active
+        active = np.flatnonzero(has_root)
+        x = 0.5 * (lo + hi)
+        for _ in range(max_iter):
+            if active.size == 0:
+                break
+            xa = x[active]
+            f, fp = _npv_and_derivative(cf[active], xa)
+            iterations[active] += 1
+
+            # Shrink bracket around the root
+            same_side = np.sign(f) == np.sign(f_lo[active])
+            lo[active] = np.where(same_side, xa, lo[active])
+            f_lo[active] = np.where(same_side, f, f_lo[active])
+            hi[active] = np.where(same_side, hi[active], xa)
+
+            # Newton step, fall back to bisection when it leaves the bracket
+            with np.errstate(divide='ignore', invalid='ignore'):
+                newton = xa - f / fp
+            inside = np.isfinite(newton) & (newton > lo[active]) & (newton < hi[active])
+            x_new = np.where(inside, newton, 0.5 * (lo[active] + hi[active]))
+
+            done = (np.abs(f) <= tol * scale[active]) | (np.abs(x_new - xa) <= tol * (1 + np.abs(xa)))
+            finished = active[done]
+            irr[finished] = np.where(np.abs(f[done]) <= tol * scale[finished], xa[done], x_new[done])
+            converged[finished] = True
+
+            x[active] = x_new
+            active = active[~done]
+
+        status = np.where(converged, 'converged', np.where(has_root, 'max_iter', 'no_sign_change'))
+        status = np.where(degenerate, 'zero_cash_flows', status)
+        return {
+            "irr": irr,
+            "converged": converged,
+            "status": status,
+            "iterations": iterations
+        }
+
+    @staticmethod
+    def run_monte_carlo(
+        project: ProjectInput,
+        iterations: int = 5000,
+        seed: int = 42,
+        include_path_metrics: bool = False,
+        method: str = "standard",
+        histogram: str = None,
+        bins: int = 50,
+        include_distribution: bool = True
+    ) -> dict:
         """
         Vectorized Monte Carlo Simulation.
-        Output: dict with 'distribution' (list of NPVs) and 'prob_loss' (float).
+        Output: dict with 'distribution' (list of NPVs) and 'prob_loss' (float),
+        plus 'mean' NPV and standard errors of both estimates.
+        With include_path_metrics, also 'path_metrics': percentile summaries of
+        per-path IRR, payback period and profitability index, computed on the
+        same simulated matrix.
+
+        method (variance reduction):
+        - "standard":        plain pseudo-random paths.
+        - "antithetic":      paths come in (z, -z) pairs.
+        - "control_variate": prob_loss is adjusted with NPV as control, whose
+                             expectation is known analytically.
+        - "sobol":           randomized (scrambled) Sobol points, in
+                             SOBOL_REPLICATES independent replicates of 2^m points;
+                             iterations is rounded up to fill them.
+
+        histogram ("fixed" | "fd" | "quantile") adds a binned 'histogram'
+        (HistogramBins, at most `bins` bins). With include_distribution=False
+        the raw 'distribution' list is dropped so callers ship only the bins.
         """
-        np.random.seed(42) # Reproducibility
+        if method not in MONTE_CARLO_METHODS:
+            raise ValueError(f"Unknown Monte Carlo method '{method}'. Use one of {MONTE_CARLO_METHODS}")
+
+        # Local generator: reproducible without touching global RNG state,
+        # so concurrent callbacks cannot clobber each other.
+        rng = np.random.default_rng(seed)
         
         # Cash Flows: Matrix of shape (iterations, years)
         years = len(project.cash_flows)
@@ -78,8 +211,9 @@ class CapitalBudgetingEngine:
         
         # Generate random CFs
         # shape: (iterations, years)
-        # normal(loc, scale, size)
-        simulated_cfs = np.random.normal(loc=means, scale=stds, size=(iterations, years))
+        shocks = _standard_normal_draws(rng, iterations, years, method)
+        iterations = shocks.shape[0]
+        simulated_cfs = means + stds * shocks
         
         # Prepend initial investment (constant)
         # shape: (iterations, years+1)
@@ -98,11 +232,400 @@ class CapitalBudgetingEngine:
         # Sum along axis 1 (years)
         npvs = np.sum(discounted_flows, axis=1)
         
-        # Stats
-        loss_count = np.sum(npvs < 0)
-        prob_loss = loss_count / iterations
+        # Stats (estimates and standard errors depend on the sampling method)
+        stats = CapitalBudgetingEngine._estimate_npv_stats(project, npvs, method)
         
+        result = {
+            "iterations": iterations,
+            "method": method,
+            **stats
+        }
+        if include_distribution:
+            result["distribution"] = npvs.tolist()
+        if histogram is not None:
+            result["histogram"] = CapitalBudgetingEngine.bin_distribution(npvs, method=histogram, bins=bins)
+
+        if include_path_metrics:
+            result["path_metrics"] = CapitalBudgetingEngine._path_metrics(project, full_stream, npvs)
+
+        return result
+
+    @staticmethod
+    def bin_distribution(values, method: str = "fixed", bins: int = 50) -> HistogramBins:
+        """
+        Bins a simulated distribution on the server.
+        - "fixed":    `bins` equal-width bins over [min, max].
+        - "fd":       Freedman-Diaconis width (2 * IQR / n^(1/3)), capped at `bins` bins.
+        - "quantile": `bins` equal-count bins (edges at quantiles; ties merge edges).
+        """
+        values = np.asarray(values, dtype=float)
+        values = values[np.isfinite(values)]
+        if values.size == 0:
+            return HistogramBins(method=method, edges=[], counts=[], total=0)
+
+        if method == "fixed":
+            edges = np.histogram_bin_edges(values, bins=bins)
+        elif method == "fd":
+            edges = np.histogram_bin_edges(values, bins='fd')
+            if len(edges) - 1 > bins:
+                # Payload cap: FD grows with n^(1/3)
+                edges = np.histogram_bin_edges(values, bins=bins)
+        elif method == "quantile":
+            edges = np.unique(np.quantile(values, np.linspace(0, 1, bins + 1)))
+            if edges.size < 2:
+                edges = np.histogram_bin_edges(values, bins=1)
+        else:
+            raise ValueError(f"Unknown histogram method '{method}'. Use 'fixed', 'fd' or 'quantile'")
+
+        counts, edges = np.histogram(values, bins=edges)
+        return HistogramBins(method=method, edges=edges.tolist(), counts=counts.tolist(), total=int(values.size))
+
+    @staticmethod
+    def _estimate_npv_stats(project: ProjectInput, npvs: np.ndarray, method: str) -> dict:
+        """
+        prob_loss and mean NPV with their standard errors.
+        Standard errors use independent units: single paths, antithetic pairs,
+        or Sobol replicates.
+        """
+        losses = (npvs < 0).astype(float)
+
+        if method == "antithetic":
+            # Pair k is (path k, path k + n_pairs); a trailing odd path is left out of the errors
+            n_pairs = len(npvs) // 2
+            units_loss = 0.5 * (losses[:n_pairs] + losses[n_pairs:2 * n_pairs])
+            units_npv = 0.5 * (npvs[:n_pairs] + npvs[n_pairs:2 * n_pairs])
+        elif method == "sobol":
+            units_loss = losses.reshape(SOBOL_REPLICATES, -1).mean(axis=1)
+            units_npv = npvs.reshape(SOBOL_REPLICATES, -1).mean(axis=1)
+        else:
+            units_loss, units_npv = losses, npvs
+
+        if method == "control_variate":
+            # Y - beta * (X - E[X]) with X = NPV, E[X] known analytically
+            expected_npv, _ = CapitalBudgetingEngine._npv_moments(project)
+            var_npv = npvs.var()
+            beta = np.cov(losses, npvs, bias=True)[0, 1] / var_npv if var_npv > 0 else 0.0
+            adjusted = losses - beta * (npvs - expected_npv)
+            return {
+                "prob_loss": float(np.clip(adjusted.mean(), 0.0, 1.0)),
+                "std_error": float(adjusted.std(ddof=1) / np.sqrt(len(npvs))) if len(npvs) > 1 else 0.0,
+                # The control itself has zero error: its mean is known exactly
+                "mean": expected_npv,
+                "mean_std_error": 0.0
+            }
+
+        n_units = len(units_loss)
         return {
-            "distribution": npvs.tolist(),
-            "prob_loss": float(prob_loss)
+            "prob_loss": float(losses.mean()),
+            "std_error": float(units_loss.std(ddof=1) / np.sqrt(n_units)) if n_units > 1 else 0.0,
+            "mean": float(npvs.mean()),
+            "mean_std_error": float(units_npv.std(ddof=1) / np.sqrt(n_units)) if n_units > 1 else 0.0
         }
+
+    @staticmethod
+    def run_joint_monte_carlo(
+        projects: List[ProjectInput],
+        correlation: Sequence[Sequence[float]] = None,
+        autocorrelation: float = 0.0,
+        iterations: int = 5000,
+        seed: int = 42
+    ) -> dict:
+        """
+        Joint Monte Carlo Simulation of several projects in one batched draw.
+        - correlation: (k x k) correlation of the projects' cash-flow shocks within a year
+          (identity if omitted). Its Cholesky factor is cached per matrix.
+        - autocorrelation: AR(1) coefficient of each project's shocks across years,
+          scaled so every year keeps variance (means * volatility)^2.
+        Projects with fewer years are padded with zero cash flows.
+        Output: per-project 'distribution' / 'prob_loss' / 'mean', plus 'prob_best'
+        (share of paths where each project has the highest NPV) and the realised
+        NPV correlation matrix.
+        """
+        k = len(projects)
+        if k == 0:
+            raise ValueError("At least one project is required")
+        if not -1.0 < autocorrelation < 1.0:
+            raise ValueError("Autocorrelation must be strictly between -1 and 1")
+
+        chol = _cholesky_factor(_as_key(np.eye(k) if correlation is None else correlation, k))
+
+        # Stack project parameters as (years, k) matrices, zero-padded
+        years = max(len(p.cash_flows) for p in projects)
+        means = np.zeros((years, k))
+        for j, p in enumerate(projects):
+            means[:len(p.cash_flows), j] = p.cash_flows
+        stds = means * np.array([p.volatility for p in projects])
+        rates = np.array([p.discount_rate for p in projects])
+        t = np.arange(1, years + 1)
+        discount_factors = 1 / ((1 + rates[None, :]) ** t[:, None])
+        initial = np.array([p.initial_investment for p in projects])
+
+        # 1. One draw for all projects: (iterations, years, k), correlated across projects
+        rng = np.random.default_rng(seed)
+        shocks = rng.standard_normal((iterations, years, k)) @ chol.T
+
+        # 2. AR(1) across years: e_t = phi * e_{t-1} + sqrt(1 - phi^2) * z_t, e_0 = z_0
+        if autocorrelation != 0.0:
+            scale = np.sqrt(1 - autocorrelation ** 2)
+            shocks[:, 0, :] /= scale
+            shocks = lfilter([scale], [1.0, -autocorrelation], shocks, axis=1)
+
+        # 3. Cash flows and NPV per path and project: (iterations, k)
+        simulated_cfs = means + stds * shocks
+        npvs = np.einsum('itk,tk->ik', simulated_cfs, discount_factors) - initial
+
+        best = np.bincount(np.argmax(npvs, axis=1), minlength=k) / iterations
+        npv_correlation = np.corrcoef(npvs, rowvar=False) if k > 1 else np.ones((1, 1))
+
+        return {
+            "projects": [
+                {
+                    "name": p.name,
+                    "distribution": npvs[:, j].tolist(),
+                    "prob_loss": float(np.mean(npvs[:, j] < 0)),
+                    "mean": float(npvs[:, j].mean())
+                }
+                for j, p in enumerate(projects)
+            ],
+            "prob_best": best.tolist(),
+            "npv_correlation": np.atleast_2d(npv_correlation).tolist()
+        }
+
+    @staticmethod
+    def _path_metrics(project: ProjectInput, full_stream: np.ndarray, npvs: np.ndarray) -> dict:
+        """
+        IRR, payback and PI for every simulated path, summarised by percentiles.
+        """
+        irr = CapitalBudgetingEngine.calculate_irr_batch(full_stream)
+        payback = CapitalBudgetingEngine.calculate_payback_batch(full_stream)
+        # PI = PV of Future / Initial Investment = (NPV + Initial) / Initial
+        pi = (npvs + project.initial_investment) / project.initial_investment
+
+        irr_summary = _percentile_summary(irr["irr"][irr["converged"]])
+        irr_summary["converged_share"] = float(np.mean(irr["converged"]))
+
+        paid_back = np.isfinite(payback)
+        payback_summary = _percentile_summary(payback[paid_back])
+        payback_summary["prob_no_payback"] = float(1 - np.mean(paid_back))
+
+        return {
+            "irr": irr_summary,
+            "payback": payback_summary,
+            "pi": _percentile_summary(pi)
+        }
+
+    @staticmethod
+    def _npv_moments(project: ProjectInput) -> tuple:
+        """
+        Analytic mean and std of the simulated NPV.
+        NPV is a linear combination of independent normal cash flows,
+        so it is itself normal with these moments.
+        """
+        means = np.array(project.cash_flows)
+        stds = means * project.volatility
+        t = np.arange(1, len(means) + 1)
+        discount_factors = 1 / ((1 + project.discount_rate) ** t)
+        mean = float(np.dot(means, discount_factors) - project.initial_investment)
+        std = float(np.sqrt(np.sum((stds * discount_factors) ** 2)))
+        return mean, std
+
+    @staticmethod
+    def _new_npv_summary(project: ProjectInput) -> StreamingSummary:
+        """
+        Empty NPV summary whose sketch covers mean +/- 8 std of the analytic distribution.
+        The wide range is for tail quantiles only; the display histogram is cut to
+        +/- DISPLAY_STD_RANGE std in _summary_to_dict.
+        """
+        mean, std = CapitalBudgetingEngine._npv_moments(project)
+        half_width = 8 * std if std > 0 else max(abs(mean) * 1e-6, 1.0)
+        return StreamingSummary(mean - half_width, mean + half_width, threshold=0.0)
+
+    @staticmethod
+    def _simulate_npv_chunk(project: ProjectInput, rng: np.random.Generator, size: int) -> np.ndarray:
+        """
+        NPVs for one block of paths. Discounts with a matrix-vector product,
+        so no (size, years+1) stream with the initial outlay is built.
+        """
+        means = np.array(project.cash_flows)
+        stds = means * project.volatility
+        t = np.arange(1, len(means) + 1)
+        discount_factors = 1 / ((1 + project.discount_rate) ** t)
+
+        # |std|: a negative cash-flow year still gets a valid spread (rng.normal rejects scale < 0)
+        simulated_cfs = means + np.abs(stds) * rng.standard_normal((size, len(means)))
+        return simulated_cfs @ discount_factors - project.initial_investment
+
+    @staticmethod
+    def _summary_to_dict(summary: StreamingSummary, bins: int) -> dict:
+        # Display bins over mean +/- 4 std: over the full +/- 8 std sketch most of them would be empty
+        if summary.std > 0:
+            half_width = DISPLAY_STD_RANGE * summary.std
+            histogram = summary.histogram(bins, summary.mean - half_width, summary.mean + half_width)
+        else:
+            histogram = summary.histogram(bins)
+        return {
+            "iterations": summary.count,
+            "mean": summary.mean,
+            "std": summary.std,
+            "min": summary.min,
+            "max": summary.max,
+            "prob_loss": summary.below_threshold / summary.count,
+            "percentiles": {
+                "p5": summary.quantile(0.05),
+                "p50": summary.quantile(0.50),
+                "p95": summary.quantile(0.95)
+            },
+            "histogram": histogram
+        }
+
+    @staticmethod
+    def run_monte_carlo_streaming(
+        project: ProjectInput,
+        iterations: int = 1_000_000,
+        chunk_size: int = 100_000,
+        seed: int = 42,
+        bins: int = 50
+    ) -> dict:
+        """
+        Chunked Monte Carlo Simulation with bounded memory.
+        Paths are simulated in blocks of `chunk_size` and folded into a
+        running summary, so peak memory depends on chunk_size, not iterations.
+        Output: compact summary (mean, std, prob_loss, percentiles, histogram)
+        instead of the raw distribution.
+        """
+        if iterations <= 0 or chunk_size <= 0:
+            raise ValueError("iterations and chunk_size must be positive")
+
+        summary = _stream_npv_summary(project, iterations, chunk_size, np.random.SeedSequence(seed))
+        return CapitalBudgetingEngine._summary_to_dict(summary, bins)
+
+    @staticmethod
+    def run_monte_carlo_parallel(
+        project: ProjectInput,
+        iterations: int = 1_000_000,
+        workers: int = None,
+        seed: int = 42,
+        chunk_size: int = 100_000,
+        bins: int = 50
+    ) -> dict:
+        """
+        Multi-core chunked Monte Carlo Simulation.
+        Iterations are split across a process pool; each worker draws from its own
+        child stream of SeedSequence(seed).spawn(workers) and returns a running summary.
+        Summaries are merged in worker order, so the result is bit-reproducible
+        for a given (seed, workers) pair. No global RNG state is used.
+        """
+        if iterations <= 0 or chunk_size <= 0:
+            raise ValueError("iterations and chunk_size must be positive")
+
+        workers = workers or os.cpu_count() or 1
+        workers = max(1, min(workers, iterations))
+
+        # Deterministic split: the first (iterations % workers) workers take one extra path
+        shares = [iterations // workers + (1 if i < iterations % workers else 0) for i in range(workers)]
+        child_seeds = np.random.SeedSequence(seed).spawn(workers)
+        tasks = [(project, n, chunk_size, child) for n, child in zip(shares, child_seeds)]
+
+        if workers == 1:
+            partials = [_stream_npv_summary(*tasks[0])]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                # map() yields in submission order regardless of completion order
+                partials = list(pool.map(_stream_npv_summary_task, tasks))
+
+        summary = partials[0]
+        for partial in partials[1:]:
+            summary.merge(partial)
+
+        return CapitalBudgetingEngine._summary_to_dict(summary, bins)
+
+def _standard_normal_draws(rng: np.random.Generator, iterations: int, years: int, method: str) -> np.ndarray:
+    """
+    (iterations, years) standard normal shocks for the chosen sampling method.
+    """
+    if method == "antithetic":
+        n_pairs, extra = divmod(iterations, 2)
+        half = rng.standard_normal((n_pairs + extra, years))
+        # Layout: [z_1..z_n, -z_1..-z_n, unpaired extra]
+        return np.vstack((half[:n_pairs], -half[:n_pairs], half[n_pairs:]))
+
+    if method == "sobol":
+        # Each replicate holds 2^m points to keep Sobol balance properties
+        m = int(np.ceil(np.log2(max(1, -(-iterations // SOBOL_REPLICATES)))))
+        uniforms = np.vstack([
+            qmc.Sobol(d=years, scramble=True, seed=rng).random_base2(m)
+            for _ in range(SOBOL_REPLICATES)
+        ])
+        return norm.ppf(np.clip(uniforms, 1e-12, 1 - 1e-12))
+
+    return rng.standard_normal((iterations, years))
+
+def _as_key(correlation, k: int) -> tuple:
+    """
+    Validates a correlation matrix and turns it into a hashable cache key.
+    """
+    matrix = np.asarray(correlation, dtype=float)
+    if matrix.shape != (k, k):
+        raise ValueError(f"Correlation matrix must be {k}x{k}")
+    if not np.allclose(matrix, matrix.T) or not np.allclose(np.diag(matrix), 1.0):
+        raise ValueError("Correlation matrix must be symmetric with a unit diagonal")
+    return tuple(map(tuple, matrix))
+
+@lru_cache(maxsize=32)
+def _cholesky_factor(key: tuple) -> np.ndarray:
+    """
+    Lower Cholesky factor of a correlation matrix, cached per matrix.
+    """
+    try:
+        chol = np.linalg.cholesky(np.array(key))
+    except np.linalg.LinAlgError:
+        raise ValueError("Correlation matrix must be positive definite")
+    chol.flags.writeable = False # Shared between callers
+    return chol
+
+def _percentile_summary(values: np.ndarray) -> dict:
+    """
+    Mean and P5 / P50 / P95 of a sample (NaN when the sample is empty).
+    """
+    if values.size == 0:
+        return {"mean": float('nan'), "p5": float('nan'), "p50": float('nan'), "p95": float('nan')}
+    p5, p50, p95 = np.percentile(values, [5, 50, 95])
+    return {"mean": float(values.mean()), "p5": float(p5), "p50": float(p50), "p95": float(p95)}
+
+def _npv_and_derivative(cf: np.ndarray, rates: np.ndarray) -> tuple:
+    """
+    NPV(r) and dNPV/dr per row via Horner's scheme in v = 1 / (1 + r).
+    Avoids a power per cell on every solver iteration.
+    """
+    v = 1 / (1 + rates)
+    f = np.zeros_like(v)
+    df_dv = np.zeros_like(v)
+    for column in cf.T[::-1]:
+        df_dv = df_dv * v + f
+        f = f * v + column
+    # dv/dr = -v^2
+    return f, -df_dv * v ** 2
+
+def _stream_npv_summary(
+    project: ProjectInput,
+    iterations: int,
+    chunk_size: int,
+    seed_seq: np.random.SeedSequence
+) -> StreamingSummary:
+    """
+    Simulates `iterations` NPV paths in blocks and folds them into a running summary.
+    Module-level so it can run inside a process pool.
+    """
+    rng = np.random.default_rng(seed_seq)
+    summary = CapitalBudgetingEngine._new_npv_summary(project)
+
+    remaining = iterations
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        summary.update(CapitalBudgetingEngine._simulate_npv_chunk(project, rng, size))
+        remaining -= size
+
+    return summary
+
+def _stream_npv_summary_task(task: tuple) -> StreamingSummary:
+    return _stream_npv_summary(*task)
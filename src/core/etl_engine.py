@@ -1,7 +1,14 @@
 import pandas as pd
 import numpy as np
-from thefuzz import process
+from rapidfuzz import fuzz, process, utils
 import re
+import os
+import json
+import glob
+import unicodedata
+from pandas.tseries.api import guess_datetime_format
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, Optional, Sequence
 
 class SmartImporter:
     
@@ -13,88 +20,482 @@ class SmartImporter:
         'net_income': ['net_income', 'profit', 'bottom_line', 'net_profit']
     }
 
+    # Rows per chunk for streaming imports
+    DEFAULT_CHUNK_SIZE = 100_000
+
+    # Fuzzy scores (0-100) above this map a column
+    MATCH_THRESHOLD = 85
+    # Extra synonyms, one JSON file per locale: {"revenue": ["umsatz", ...], ...}
+    SYNONYM_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'config', 'column_synonyms')
+    # Confirmed mappings per source system (local state, not versioned)
+    MAPPING_MEMORY_PATH = os.getenv(
+        "COLUMN_MAPPINGS_PATH",
+        os.path.join(os.path.dirname(__file__), '..', '..', 'config', 'column_mappings.json')
+    )
+
     @staticmethod
-    def fuzzy_map_columns(df: pd.DataFrame) -> tuple[pd.DataFrame, dict]:
+    def fuzzy_map_columns(df: pd.DataFrame, source_system: Optional[str] = None) -> tuple[pd.DataFrame, dict]:
         """
         Maps DataFrame columns to STANDARD_SCHEMA using fuzzy matching.
         Threshold: > 85.
         Returns: (Mapped DataFrame, Report Dict)
         """
-        mapped_df = df.copy()
-        
-        # Build choices list from all variation lists
-        # We need a reverse map to know which standard key a variation belongs to
-        variation_map = {}
-        for std, variations in SmartImporter.STANDARD_SCHEMA.items():
-            variation_map[std] = std # Map canonical to itself
-            for v in variations:
-                variation_map[v] = std
-                
-        choices = list(variation_map.keys())
-        
-        mapping_report = {}
-        new_columns = {}
-        
-        for col in df.columns:
-            col_clean = str(col).lower().strip()
-            
-            # extractOne returns (match, score)
-            # Use score_cutoff to optimize? process.extractOne(query, choices, score_cutoff=0)
-            best_match, score = process.extractOne(col_clean, choices)
-            
-            if score > 85:
-                canonical = variation_map[best_match]
-                # Avoid duplicate mapping if multiple cols map to same canonical?
-                # For now, simplistic mapping.
-                new_columns[col] = canonical
-                mapping_report[col] = canonical
+        new_columns, mapping_report = SmartImporter.map_columns(df.columns, source_system)
+        # rename returns a new frame without duplicating the column data (copy-on-write)
+        return df.rename(columns=new_columns), mapping_report
+
+    @staticmethod
+    def map_columns(columns, source_system: Optional[str] = None) -> tuple[dict, dict]:
+        """
+        Decides the column mapping from header names alone.
+        Headers confirmed earlier for `source_system` (see confirm_mapping) are reused
+        as-is; only the others are looked up in the column index.
+        Returns: (rename dict {original: canonical}, Report Dict)
+        """
+        remembered = MappingMemory(SmartImporter.MAPPING_MEMORY_PATH).get(source_system) if source_system else {}
+        unknown = [col for col in columns if str(col) not in remembered]
+        matched, matched_report = SmartImporter.column_index().match(unknown) if unknown else ({}, {})
+
+        new_columns, mapping_report = {}, {}
+        for col in columns:
+            if str(col) in remembered:
+                canonical = remembered[str(col)]
+                if canonical is not None:
+                    new_columns[col] = canonical
+                mapping_report[col] = canonical or "Unmapped (Confirmed)"
             else:
-                mapping_report[col] = "Unmapped (Low Confidence)"
-                
-        mapped_df.rename(columns=new_columns, inplace=True)
-        return mapped_df, mapping_report
+                if col in matched:
+                    new_columns[col] = matched[col]
+                mapping_report[col] = matched_report[col]
+        return new_columns, mapping_report
+
+    @staticmethod
+    def confirm_mapping(source_system: str, rename: dict, columns: Optional[Iterable] = None) -> None:
+        """
+        Remembers a reviewed mapping for a source system so its next imports skip scoring.
+        columns: every header of the file (headers missing from rename are remembered as unmapped);
+        defaults to the keys of rename.
+        """
+        columns = list(rename) if columns is None else list(columns)
+        MappingMemory(SmartImporter.MAPPING_MEMORY_PATH).update(
+            source_system, {str(col): rename.get(col) for col in columns}
+        )
 
     @staticmethod
-    def clean_financial_values(df: pd.DataFrame) -> pd.DataFrame:
+    def column_index() -> "ColumnIndex":
+        """
+        The shared index over STANDARD_SCHEMA and the synonym files; rebuilt only
+        when a synonym file is added, removed or modified.
+        """
+        global _COLUMN_INDEX
+        files = sorted(glob.glob(os.path.join(SmartImporter.SYNONYM_DIR, '*.json')))
+        signature = (tuple((f, os.path.getmtime(f)) for f in files), SmartImporter.MATCH_THRESHOLD)
+        if _COLUMN_INDEX is None or _COLUMN_INDEX.signature != signature:
+            synonyms = []
+            for path in files:
+                with open(path, encoding='utf-8') as f:
+                    synonyms.append(json.load(f))
+            _COLUMN_INDEX = ColumnIndex(SmartImporter.STANDARD_SCHEMA, synonyms, SmartImporter.MATCH_THRESHOLD)
+            _COLUMN_INDEX.signature = signature
+        return _COLUMN_INDEX
+
+    # Separator patterns used to tell "1.234,56" (European) from "1,234.56" (US), one cell per line
+    EUROPEAN_DECIMAL_PATTERN = re.compile(r',\d{1,2}\)?-?[ \t$€£¥]*$|\.\d{3}[.,]', re.MULTILINE)
+    US_DECIMAL_PATTERN = re.compile(r'\.\d{1,2}\)?-?[ \t$€£¥]*$|,\d{3}[.,]', re.MULTILINE)
+
+    @staticmethod
+    def detect_decimal_separator(series: pd.Series) -> str:
+        """
+        ',' if the column is written with European decimal commas, else '.'.
+        Only unambiguous values count ("1.234,56", "12,5" vs "1,234.56", "12.5");
+        a column with no decisive value (e.g. only "1,234") keeps the US reading.
+        """
+        text = _join_cells(series.to_numpy(dtype=object))
+        # One US-style value settles it; the (full) scan for European ones is only needed otherwise
+        if SmartImporter.US_DECIMAL_PATTERN.search(text) is not None:
+            return '.'
+        return ',' if SmartImporter.EUROPEAN_DECIMAL_PATTERN.search(text) is not None else '.'
+
+    @staticmethod
+    def parse_accounting_values(series: pd.Series, decimal: Optional[str] = None) -> pd.Series:
+        """
+        Vectorized accounting-number parser (pandas string ops, no per-cell Python).
+        - Currency symbols ($ EUR GBP JPY signs) and thousands separators are removed
+        - "(100)" and "100-" are negative; a lone "-" is 0.0
+        - decimal: '.', ',' (European "1.234,56") or None to detect per column
+        - Anything else unparseable becomes NaN
+        """
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            return series.astype(float)
+        if decimal is None:
+            decimal = SmartImporter.detect_decimal_separator(series)
+
+        text = series.astype(str).str.strip().str.replace('[$€£¥]', '', regex=True)
+        valid = pd.Series(True, index=series.index)
+        if decimal == ',':
+            # Spaces group thousands here, so "33e 3" must be rejected before they are dropped
+            valid &= ~(text.str.contains('[eE]') & text.str.contains(r'\S\s+\S'))
+            # European: '.' and (non-breaking) spaces group thousands, ',' is the decimal point
+            # (literal characters: the Arrow-backed str dtype's regex engine has no \u escapes)
+            text = text.str.replace('[.\\s\u00a0\u202f]', '', regex=True).str.replace(',', '.', regex=False)
+        else:
+            text = text.str.replace(',', '', regex=False)
+        text = text.str.strip()
+
+        dash = text == '-'
+        parenthesised = text.str.startswith('(') & text.str.endswith(')')
+        trailing_minus = text.str.endswith('-') & ~dash
+        body = text.where(~parenthesised, text.str[1:-1])
+        body = body.where(~trailing_minus, body.str[:-1]).str.strip()
+
+        valid &= body.str.fullmatch(ACCOUNTING_NUMBER_PATTERN)
+        # "-910-": one sign only
+        valid &= ~(trailing_minus & body.str.match('[+-]'))
+        # astype(float) rounds exactly like float(); to_numeric's fast path does not
+        values = body.where(valid).astype(float)
+        values = values.where(~(parenthesised | trailing_minus), -values)
+        return values.mask(dash, 0.0).rename(series.name)
+
+    @staticmethod
+    def clean_financial_values(df: pd.DataFrame, decimal=None, date_format: Optional[str] = None) -> pd.DataFrame:
         """
         Cleans financial columns (Revenue, COGS, etc.) and Date column.
+        decimal: None (detect per column), '.' / ',' for all columns, or {column: separator}.
+        date_format: strftime format of the date column (see infer_date_format); None lets
+        pandas infer it from this frame's first date.
         """
-        cleaned_df = df.copy()
+        # Shallow copy: columns are replaced whole below, so the caller's frame is never modified
+        cleaned_df = df.copy(deep=False)
         
         # Identify financial columns (those in STANDARD_SCHEMA keys) that are present
         financial_keys = [k for k in SmartImporter.STANDARD_SCHEMA.keys() if k != 'date']
         present_fin_cols = [c for c in cleaned_df.columns if c in financial_keys]
         
         for col in present_fin_cols:
-            # Convert to string to clean
-            series = cleaned_df[col].astype(str).str.strip()
-            
-            # Remove symbols: $, €, ,
-            series = series.str.replace(r'[$,€]', '', regex=True)
-            series = series.str.replace(',', '', regex=False)
-            
-            # Handle Accounting Negatives: (100) -> -100
-            # Regex to find (digits)
-            # We can use a lambda to be precise
-            def parse_accounting(val):
-                if pd.isna(val) or val == 'nan':
-                    return np.nan
-                val = val.strip()
-                if val == '-':
-                    return 0.0
-                if val.startswith('(') and val.endswith(')'):
-                    val = val[1:-1]
-                    return -1.0 * float(val)
-                try:
-                    return float(val)
-                except:
-                    return np.nan # Garbage
-            
-            cleaned_df[col] = series.apply(parse_accounting)
+            separator = decimal.get(col) if isinstance(decimal, dict) else decimal
+            cleaned_df[col] = SmartImporter.parse_accounting_values(cleaned_df[col], separator)
 
         # Date Parsing
         if 'date' in cleaned_df.columns:
             # Coerce errors to NaT, try inferring format
-            cleaned_df['date'] = pd.to_datetime(cleaned_df['date'], errors='coerce')
+            cleaned_df['date'] = pd.to_datetime(cleaned_df['date'], errors='coerce', format=date_format)
             
         return cleaned_df
+
+    @staticmethod
+    def infer_date_format(series: pd.Series) -> Optional[str]:
+        """
+        Date format guessed from the first non-blank text value, as pd.to_datetime does.
+        'mixed' (each value parsed on its own) when no single format fits that value;
+        None when there is no text date to guess from (e.g. Excel datetime cells).
+        """
+        text = series[series.map(lambda v: isinstance(v, str) and v.strip() != '')]
+        if text.empty:
+            return None
+        return guess_datetime_format(text.iloc[0].strip()) or 'mixed'
+
+    # --- Streaming Import ---
+
+    @staticmethod
+    def iter_import(
+        source,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        file_type: Optional[str] = None,
+        sheet_name=0,
+        decimal: Optional[str] = None,
+        source_system: Optional[str] = None
+    ) -> "ChunkedImport":
+        """
+        Streams a CSV or Excel export as mapped + cleaned chunks of at most chunk_size rows.
+        The column mapping is decided once from the header and applied to every chunk,
+        so peak memory is bounded by the chunk size rather than the file size.
+        source: path or file-like object (pass file_type 'csv' / 'excel' when there is no suffix).
+        decimal: '.' / ',' or None to detect each column's separator on the first chunk.
+        source_system: reuse the mapping confirmed for this system (see confirm_mapping).
+        """
+        return ChunkedImport(source, chunk_size, file_type, sheet_name, decimal, source_system)
+
+    @staticmethod
+    def stream_import(
+        source,
+        sink: Callable[[pd.DataFrame], None],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        file_type: Optional[str] = None,
+        sheet_name=0,
+        decimal: Optional[str] = None,
+        source_system: Optional[str] = None
+    ) -> dict:
+        """
+        Hands every cleaned chunk of iter_import to `sink` (e.g. StagingStore.sink).
+        Returns: {rows, chunks, mapping} where mapping is the header mapping report.
+        """
+        chunked = ChunkedImport(source, chunk_size, file_type, sheet_name, decimal, source_system)
+        rows = chunks = 0
+        for chunk in chunked:
+            sink(chunk)
+            rows += len(chunk)
+            chunks += 1
+        return {"rows": rows, "chunks": chunks, "mapping": chunked.mapping_report}
+
+    # --- Batch Ingestion ---
+
+    @staticmethod
+    def ingest_files(
+        sources: Sequence,
+        max_workers: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        decimal: Optional[str] = None,
+        source_system: Optional[str] = None
+    ) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Maps and cleans many files (e.g. one export per entity at month-end) in a process pool,
+        one task per file; max_workers=1 runs inline.
+        Results are merged on the canonical schema: STANDARD_SCHEMA columns found in any file,
+        plus 'source_file'. Unmapped columns are dropped from the merge and listed in the report.
+        A file that cannot be read is reported with its error instead of failing the batch.
+        Returns: (merged DataFrame, report DataFrame with one row per file:
+            source_file, rows, mapping, unmapped_columns, coerced_nans, unparseable_dates, error)
+        """
+        tasks = [(source, chunk_size, decimal, source_system) for source in sources]
+        if max_workers == 1:
+            results = [_ingest_file(*task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                results = list(pool.map(_ingest_file, *zip(*tasks))) if tasks else []
+
+        frames = [frame for frame, _ in results if frame is not None]
+        present = set().union(*(frame.columns for frame in frames))
+        columns = [col for col in SmartImporter.STANDARD_SCHEMA if col in present] + ['source_file']
+        merged = pd.concat([frame.reindex(columns=columns) for frame in frames], ignore_index=True) if frames else pd.DataFrame(columns=columns)
+        report = pd.DataFrame([file_report for _, file_report in results], columns=INGEST_REPORT_COLUMNS)
+        return merged, report
+
+def _non_blank(series: pd.Series) -> pd.Series:
+    return series.notna() & series.astype(str).str.strip().ne('')
+
+def _join_cells(cells: np.ndarray) -> str:
+    # One line per cell; non-string cells (None, NaN, numbers) are rendered like astype(str)
+    try:
+        return '\n'.join(cells)
+    except TypeError:
+        return '\n'.join(map(str, cells))
+
+# Body of an accounting cell once signs, parentheses and separators are stripped (what float() accepts)
+ACCOUNTING_NUMBER_PATTERN = r'[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?|[+-]?(?i:inf|infinity|nan)'
+
+# --- Column Mapping Index ---
+
+_COLUMN_INDEX = None
+
+def normalize_header(name) -> str:
+    """
+    Lookup key of a header: accents folded, lower case, separators dropped
+    ("Net Income", "net_income" and "NET-INCOME" all give "netincome").
+    """
+    folded = unicodedata.normalize('NFKD', str(name))
+    folded = ''.join(ch for ch in folded if not unicodedata.combining(ch)).lower()
+    return re.sub(r'[^0-9a-z&]', '', folded)
+
+class ColumnIndex:
+    """
+    Header -> canonical column lookup, built once per synonym set.
+    Exact (normalized) hits are a dict lookup; the remaining headers are scored
+    against every known variation in one rapidfuzz cdist call.
+    """
+
+    def __init__(self, schema: Dict[str, list], synonyms: Iterable[Dict[str, list]] = (), threshold: float = 85):
+        self.threshold = threshold
+        self.signature = None
+        self.canonical_of = {}
+        variations = {}
+        for table in [schema, *synonyms]:
+            for canonical, names in table.items():
+                if canonical not in schema:
+                    raise ValueError(f"Synonyms given for unknown column '{canonical}'")
+                for name in [canonical, *names]:
+                    key = normalize_header(name)
+                    if self.canonical_of.setdefault(key, canonical) != canonical:
+                        raise ValueError(f"'{name}' is a synonym of both '{self.canonical_of[key]}' and '{canonical}'")
+                    variations.setdefault(str(name).lower().strip(), canonical)
+        self.choices = list(variations)
+        self.targets = np.array(list(variations.values()), dtype=object)
+
+    def match(self, columns) -> tuple[dict, dict]:
+        """
+        Returns: (rename dict {original: canonical}, Report Dict) as SmartImporter.map_columns.
+        """
+        new_columns, mapping_report = {}, {}
+        fuzzy = []
+        for col in columns:
+            canonical = self.canonical_of.get(normalize_header(col))
+            if canonical is not None:
+                new_columns[col] = mapping_report[col] = canonical
+            else:
+                fuzzy.append(col)
+
+        if fuzzy:
+            queries = [str(col).lower().strip() for col in fuzzy]
+            scores = process.cdist(queries, self.choices, scorer=fuzz.WRatio, processor=utils.default_process)
+            best = scores.argmax(axis=1)
+            # Whole-number scores, as the threshold has always been applied
+            best_scores = np.round(scores[np.arange(len(fuzzy)), best])
+            for col, choice, score in zip(fuzzy, best, best_scores):
+                if score > self.threshold:
+                    new_columns[col] = mapping_report[col] = self.targets[choice]
+                else:
+                    mapping_report[col] = "Unmapped (Low Confidence)"
+        return new_columns, mapping_report
+
+class MappingMemory:
+    """
+    JSON file of confirmed mappings: {source_system: {header: canonical or null}}.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> dict:
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def get(self, source_system: str) -> dict:
+        return self.load().get(source_system, {})
+
+    def update(self, source_system: str, mapping: dict) -> None:
+        memory = self.load()
+        memory.setdefault(source_system, {}).update(mapping)
+        # Write then rename, so a crash never leaves a truncated file
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(memory, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+class ChunkedImport:
+    """
+    Iterable of mapped + cleaned chunks from one CSV / Excel source.
+    The header is read (and mapped) on construction: `rename` and `mapping_report`
+    are available before the first chunk. Auto-detected decimal separators and the
+    date format are fixed from the first chunk so every chunk is parsed the same way.
+    While iterating, `rows`, `coerced_nans` ({column: count}) and `unparseable_dates`
+    count the non-blank cells that could not be parsed.
+    """
+
+    def __init__(self, source, chunk_size: int = SmartImporter.DEFAULT_CHUNK_SIZE,
+                 file_type: Optional[str] = None, sheet_name=0, decimal: Optional[str] = None,
+                 source_system: Optional[str] = None):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        if file_type is None:
+            suffix = os.path.splitext(str(getattr(source, 'name', source)))[1].lower()
+            file_type = 'excel' if suffix in ('.xlsx', '.xlsm') else 'csv' if suffix in ('.csv', '.txt') else None
+        if file_type not in ('csv', 'excel'):
+            raise ValueError("Cannot infer file type; pass file_type='csv' or 'excel'")
+
+        self.source = source
+        self.chunk_size = chunk_size
+        self.file_type = file_type
+        self.sheet_name = sheet_name
+        self.decimal = decimal
+        self.rename, self.mapping_report = SmartImporter.map_columns(self._read_header(), source_system)
+        self.rows, self.coerced_nans, self.unparseable_dates = 0, {}, 0
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        raw_chunks = self._csv_chunks() if self.file_type == 'csv' else self._excel_chunks()
+        separators = self.decimal
+        date_format = None
+        self.rows, self.coerced_nans, self.unparseable_dates = 0, {}, 0
+        for chunk in raw_chunks:
+            chunk = chunk.rename(columns=self.rename)
+            if separators is None:
+                separators = {
+                    col: SmartImporter.detect_decimal_separator(chunk[col])
+                    for col in set(self.rename.values()) if col != 'date'
+                }
+            # Fixed from the first date seen: chunks re-inferring it could read 01/03 as Jan 3 in one
+            # chunk and Mar 1 in the next
+            if date_format is None and 'date' in chunk.columns:
+                date_format = SmartImporter.infer_date_format(chunk['date'])
+            cleaned = SmartImporter.clean_financial_values(chunk, separators, date_format)
+            self._count_quality(chunk, cleaned)
+            yield cleaned
+
+    def _count_quality(self, raw: pd.DataFrame, cleaned: pd.DataFrame) -> None:
+        # Non-blank cells the cleaning turned into NaN / NaT
+        self.rows += len(raw)
+        for col in set(self.rename.values()) & set(raw.columns):
+            lost = int((_non_blank(raw[col]) & cleaned[col].isna()).sum())
+            if col == 'date':
+                self.unparseable_dates += lost
+            else:
+                self.coerced_nans[col] = self.coerced_nans.get(col, 0) + lost
+
+    def _read_header(self) -> list:
+        if self.file_type == 'csv':
+            header = pd.read_csv(self.source, nrows=0).columns.tolist()
+            if hasattr(self.source, 'seek'):
+                self.source.seek(0)
+            return header
+        workbook, rows = self._open_sheet()
+        try:
+            return [str(col) for col in next(rows, ())]
+        finally:
+            workbook.close()
+
+    def _csv_chunks(self):
+        # Mapped columns are read as text so every chunk is parsed the same way
+        text_columns = {col: str for col in self.rename}
+        with pd.read_csv(self.source, chunksize=self.chunk_size, dtype=text_columns) as reader:
+            yield from reader
+
+    def _open_sheet(self):
+        # openpyxl read-only mode streams rows instead of loading the whole sheet
+        from openpyxl import load_workbook
+
+        if hasattr(self.source, 'seek'):
+            self.source.seek(0)
+        workbook = load_workbook(self.source, read_only=True, data_only=True)
+        sheet = workbook.worksheets[self.sheet_name] if isinstance(self.sheet_name, int) else workbook[self.sheet_name]
+        return workbook, sheet.iter_rows(values_only=True)
+
+    def _excel_chunks(self):
+        workbook, rows = self._open_sheet()
+        try:
+            header = [str(col) for col in next(rows, ())]
+            buffer = []
+            for row in rows:
+                buffer.append(row)
+                if len(buffer) == self.chunk_size:
+                    yield pd.DataFrame(buffer, columns=header)
+                    buffer = []
+            if buffer:
+                yield pd.DataFrame(buffer, columns=header)
+        finally:
+            workbook.close()
+
+INGEST_REPORT_COLUMNS = ['source_file', 'rows', 'mapping', 'unmapped_columns', 'coerced_nans', 'unparseable_dates', 'error']
+
+def _ingest_file(source, chunk_size: int, decimal: Optional[str], source_system: Optional[str]) -> tuple:
+    """
+    Worker task: one file through ChunkedImport. Returns (canonical-column frame or None, report dict).
+    """
+    name = os.path.basename(str(source))
+    report = dict(source_file=name, rows=0, mapping={}, unmapped_columns=[], coerced_nans={}, unparseable_dates=0, error=None)
+    try:
+        chunked = ChunkedImport(source, chunk_size, decimal=decimal, source_system=source_system)
+        canonical = [col for col in SmartImporter.STANDARD_SCHEMA if col in set(chunked.rename.values())]
+        chunks = [chunk[canonical] for chunk in chunked]
+    except Exception as e:
+        report['error'] = str(e)
+        return None, report
+
+    frame = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=canonical)
+    report.update(
+        rows=chunked.rows,
+        mapping=chunked.rename,
+        unmapped_columns=[col for col in chunked.mapping_report if col not in chunked.rename],
+        coerced_nans=chunked.coerced_nans,
+        unparseable_dates=chunked.unparseable_dates
+    )
+    return frame.assign(source_file=name), report
@@ -1,9 +1,426 @@
+import hashlib
+import threading
+from collections import OrderedDict
 import pandas as pd
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from statsmodels.tsa.seasonal import seasonal_decompose
 from statsmodels.tsa.holtwinters import ExponentialSmoothing
-from src.models.forecast_schemas import ForecastInput, ForecastOutput
-from typing import List
+from statsmodels.tsa.exponential_smoothing.ets import ETSModel
+from statsmodels.tsa.arima.model import ARIMA
+from src.models.forecast_schemas import ForecastInput, ForecastOutput, BatchForecastResult
+from typing import Iterable, Iterator, List, Tuple
+
+def series_fingerprint(series: pd.Series, seasonality_mode: str, engine: str = "statsmodels") -> str:
+    """
+    Hash of a preprocessed series (start date + values), the seasonality mode and the fitting engine.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{engine}:{seasonality_mode}".encode())
+    digest.update(str(series.index[0]).encode() if len(series) else b'')
+    digest.update(np.ascontiguousarray(series.to_numpy(dtype=float)).tobytes())
+    return digest.hexdigest()
+
+def _estimate_fit_bytes(fit) -> int:
+    """
+    Rough memory footprint of a fitted model: arrays held by the results and model
+    objects, plus a flat allowance for the Python objects around them.
+    """
+    total = 8 * 1024
+    for obj in (fit, getattr(fit, '_results', None), getattr(fit, 'model', None)):
+        for value in vars(obj).values() if obj is not None else ():
+            if isinstance(value, np.ndarray):
+                total += value.nbytes
+            elif isinstance(value, (pd.Series, pd.DataFrame)):
+                total += int(np.sum(value.memory_usage(index=True, deep=False)))
+            elif isinstance(value, dict):
+                # NumpyHoltWintersFit keeps its raw state arrays in a dict
+                total += sum(v.nbytes for v in value.values() if isinstance(v, np.ndarray))
+    return total
+
+class FittedModelCache:
+    """
+    Thread-safe LRU cache of fitted models, bounded by entry count and estimated bytes.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict() # key -> (fit, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, record: bool = True):
+        """
+        Cached fit or None. record=False probes without touching hit/miss counters.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if record:
+                    self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            if record:
+                self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, fit) -> None:
+        size = _estimate_fit_bytes(fit)
+        if size > self.max_bytes:
+            return # Would evict everything else; not worth caching
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (fit, size)
+            self._bytes += size
+            # Evict least recently used until both caps hold
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+# Process-wide cache used by ForecastEngine.get_fitted_model
+FIT_CACHE = FittedModelCache()
+
+# Warm start: how many appended months are searched for, and the allowed
+# ratio of new one-step RMSE to previous in-sample RMSE before a full refit
+WARM_START_MAX_NEW = 12
+WARM_START_DRIFT_THRESHOLD = 1.5
+
+# --- Vectorized monthly preprocessing ---
+
+def _to_datetime64(dates) -> np.ndarray:
+    # NumPy parses ISO strings directly; other formats go through pandas
+    try:
+        return np.asarray(dates, dtype='datetime64[s]')
+    except ValueError:
+        return pd.to_datetime(list(dates)).to_numpy(dtype='datetime64[s]')
+
+def monthly_fill(dates: np.ndarray, values: np.ndarray, series_ids: np.ndarray, n_series: int):
+    """
+    Month-start aggregation + gap filling for many series at once, without pandas.
+    dates: datetime64 array; values/series_ids: flat arrays aligned with dates (any order).
+    Each series spans its first to last observed month. Monthly means are computed
+    with bincount (NaN values are ignored), empty months are linearly interpolated
+    and months with no neighbour on one side take the nearest observed mean.
+    Returns (months datetime64[M], filled values, offsets) where series k occupies
+    [offsets[k], offsets[k + 1]) of the flat outputs.
+    """
+    month = dates.astype('datetime64[M]').astype(np.int64)
+    first = np.full(n_series, np.iinfo(np.int64).max)
+    last = np.full(n_series, np.iinfo(np.int64).min)
+    np.minimum.at(first, series_ids, month)
+    np.maximum.at(last, series_ids, month)
+
+    offsets = np.concatenate(([0], np.cumsum(last - first + 1)))
+    total = int(offsets[-1])
+    slot = offsets[series_ids] + (month - first[series_ids])
+
+    valid = ~np.isnan(values)
+    sums = np.bincount(slot[valid], weights=values[valid], minlength=total)
+    counts = np.bincount(slot[valid], minlength=total)
+    observed = counts > 0
+    with np.errstate(invalid='ignore'):
+        means = sums / counts
+
+    # Previous / next observed slot, restricted to the slot's own series
+    positions = np.arange(total)
+    segment = np.repeat(np.arange(n_series), np.diff(offsets))
+    prev_obs = np.maximum.accumulate(np.where(observed, positions, -1))
+    next_obs = np.minimum.accumulate(np.where(observed, positions, total)[::-1])[::-1]
+    has_prev = prev_obs >= offsets[segment]
+    has_next = next_obs < offsets[segment + 1]
+
+    prev_val = means[np.clip(prev_obs, 0, total - 1)]
+    next_val = means[np.clip(next_obs, 0, total - 1)]
+    span = np.maximum(next_obs - prev_obs, 1)
+    interpolated = prev_val + (positions - prev_obs) / span * (next_val - prev_val)
+    filled = np.where(has_prev & has_next, interpolated, np.where(has_prev, prev_val, next_val))
+    filled = np.where(observed, means, filled)
+    # A series with no observed value at all stays NaN
+    filled = np.where(has_prev | has_next, filled, np.nan)
+
+    months = (np.repeat(first, np.diff(offsets)) + (positions - offsets[segment])).astype('datetime64[M]')
+    return months, filled, offsets
+
+# --- Pure-NumPy Holt-Winters (additive trend, additive/multiplicative season) ---
+
+# Coarse smoothing-parameter grid, refined once around the best point per series
+HW_ALPHA_GRID = np.linspace(0.05, 0.95, 10)
+HW_BETA_GRID = np.array([0.0001, 0.01, 0.05, 0.1, 0.2, 0.35])
+HW_GAMMA_GRID = np.array([0.0001, 0.01, 0.05, 0.1, 0.2, 0.35, 0.5])
+
+def holt_winters_recursion(y, alpha, beta, gamma, l0, b0, s0, seasonal: str = 'add'):
+    """
+    Holt-Winters state recursion, vectorized over any leading batch dimensions.
+    Same equations as statsmodels (undamped):
+        level_t  = alpha * (y_t - s_{t-m}) + (1 - alpha) * (l_{t-1} + b_{t-1})   [y_t / s_{t-m} if mul]
+        trend_t  = beta * (l_t - l_{t-1}) + (1 - beta) * b_{t-1}
+        season_t = gamma * (y_t - l_{t-1} - b_{t-1}) + (1 - gamma) * s_{t-m}     [y_t / (l + b) if mul]
+    y: (..., n); alpha/beta/gamma/l0/b0: broadcastable to (...); s0: (..., m).
+    Returns fitted (..., n), level (..., n), trend (..., n), season (..., n + m)
+    where season[..., :m] are the initial seasons.
+    """
+    m = np.shape(s0)[-1]
+    steps = _holt_winters_steps(y, alpha, beta, gamma, l0, b0, s0, seasonal)
+    batch, n = next(steps)
+
+    fitted = np.empty(batch + (n,))
+    level = np.empty(batch + (n,))
+    trend = np.empty(batch + (n,))
+    season = np.empty(batch + (n + m,))
+    season[..., :m] = s0
+    for i, (fit_i, lvl, slope, season_i) in enumerate(steps):
+        fitted[..., i] = fit_i
+        level[..., i] = lvl
+        trend[..., i] = slope
+        season[..., i + m] = season_i
+    return fitted, level, trend, season
+
+def _holt_winters_steps(y, alpha, beta, gamma, l0, b0, s0, seasonal: str):
+    """
+    Generator behind holt_winters_recursion: yields (batch shape, n) first, then
+    (fitted_t, level_t, trend_t, season_t) per observation. Only the current states and
+    the last m seasons are kept, so callers that need no history (the grid search)
+    run in memory independent of n.
+    """
+    y = np.asarray(y, dtype=float)
+    n = y.shape[-1]
+    m = np.shape(s0)[-1]
+    batch = np.broadcast_shapes(y.shape[:-1], np.shape(alpha), np.shape(beta), np.shape(gamma),
+                                np.shape(l0), np.shape(b0), np.shape(s0)[:-1])
+    y = np.broadcast_to(y, batch + (n,))
+    yield batch, n
+
+    # Ring buffer: seasons[..., i % m] holds s_{i-m} when observation i is processed
+    seasons = np.array(np.broadcast_to(np.asarray(s0, dtype=float), batch + (m,)))
+    lvl = np.broadcast_to(np.asarray(l0, dtype=float), batch)
+    slope = np.broadcast_to(np.asarray(b0, dtype=float), batch)
+    multiplicative = seasonal == 'mul'
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        for i in range(n):
+            s_prev = seasons[..., i % m]
+            base = lvl + slope
+            if multiplicative:
+                fitted = base * s_prev
+                new_lvl = alpha * (y[..., i] / s_prev) + (1 - alpha) * base
+                new_season = gamma * (y[..., i] / base) + (1 - gamma) * s_prev
+            else:
+                fitted = base + s_prev
+                new_lvl = alpha * (y[..., i] - s_prev) + (1 - alpha) * base
+                new_season = gamma * (y[..., i] - base) + (1 - gamma) * s_prev
+            seasons[..., i % m] = new_season
+            slope = beta * (new_lvl - lvl) + (1 - beta) * slope
+            lvl = new_lvl
+            yield fitted, lvl, slope, new_season
+
+def _heuristic_initial_states(y: np.ndarray, m: int, seasonal: str):
+    """
+    Initial level/trend/seasons from the first two seasonal cycles. y: (k, n).
+    """
+    first, second = y[:, :m].mean(axis=1), y[:, m:2 * m].mean(axis=1)
+    b0 = (second - first) / m
+    # Level just before the first observation (first-cycle mean sits mid-cycle)
+    l0 = first - b0 * (m + 1) / 2
+    cycle_trend = l0[:, None] + b0[:, None] * np.arange(1, m + 1)
+    s0 = y[:, :m] / cycle_trend if seasonal == 'mul' else y[:, :m] - cycle_trend
+    return l0, b0, s0
+
+def _grid_sse(y, alphas, betas, gammas, l0, b0, s0, seasonal):
+    """
+    SSE for every (series, parameter set): alphas/betas/gammas are (k, P) or (P,).
+    Accumulated step by step: no (k, P, n) state history is built.
+    """
+    steps = _holt_winters_steps(
+        y[:, None, :], alphas, betas, gammas, l0[:, None], b0[:, None], s0[:, None, :], seasonal
+    )
+    batch, _ = next(steps)
+    sse = np.zeros(batch)
+    with np.errstate(over='ignore', invalid='ignore'):
+        for i, (fitted, _, _, _) in enumerate(steps):
+            sse += (y[:, None, i] - fitted) ** 2
+    return np.where(np.isfinite(sse), sse, np.inf)
+
+def fit_holt_winters_numpy(values, seasonal: str = 'add', m: int = 12) -> dict:
+    """
+    Fits Holt-Winters to one or many equal-length series with a vectorized grid search.
+    values: (n,) or (k, n). Needs at least two seasonal cycles.
+    Multiplicative seasonality requires strictly positive data.
+    Returns a dict of arrays (leading dim k): alpha, beta, gamma, l0, b0, s0,
+    fitted, level, trend, season, sse.
+    """
+    y = np.atleast_2d(np.asarray(values, dtype=float))
+    if y.shape[1] < 2 * m:
+        raise ValueError(f"NumPy Holt-Winters needs at least {2 * m} observations")
+    if seasonal == 'mul' and np.any(y <= 0):
+        raise ValueError("Multiplicative seasonality requires strictly positive values")
+
+    l0, b0, s0 = _heuristic_initial_states(y, m, seasonal)
+    rows = np.arange(y.shape[0])
+
+    # 1. Coarse grid shared by all series
+    A, B, G = (g.ravel() for g in np.meshgrid(HW_ALPHA_GRID, HW_BETA_GRID, HW_GAMMA_GRID, indexing='ij'))
+    best = np.argmin(_grid_sse(y, A, B, G, l0, b0, s0, seasonal), axis=1)
+    alpha, beta, gamma = A[best], B[best], G[best]
+
+    # 2. Local refinement: 5 x 5 x 5 box around each series' coarse optimum
+    offsets = np.linspace(-0.5, 0.5, 5)
+    dA, dB, dG = (g.ravel() for g in np.meshgrid(offsets, offsets, offsets, indexing='ij'))
+    alphas = np.clip(alpha[:, None] * (1 + dA), 1e-4, 1.0)
+    betas = np.clip(beta[:, None] * (1 + dB), 1e-4, 1.0)
+    gammas = np.clip(gamma[:, None] * (1 + dG), 1e-4, 1.0)
+    sse = _grid_sse(y, alphas, betas, gammas, l0, b0, s0, seasonal)
+    best = np.argmin(sse, axis=1)
+    alpha, beta, gamma = alphas[rows, best], betas[rows, best], gammas[rows, best]
+
+    fitted, level, trend, season = holt_winters_recursion(y, alpha, beta, gamma, l0, b0, s0, seasonal)
+    return {
+        "alpha": alpha, "beta": beta, "gamma": gamma,
+        "l0": l0, "b0": b0, "s0": s0,
+        "fitted": fitted, "level": level, "trend": trend, "season": season,
+        "sse": sse[rows, best]
+    }
+
+def forecast_holt_winters_numpy(fit: dict, steps: int, seasonal: str = 'add') -> np.ndarray:
+    """
+    h-step forecasts (k, steps) from the final states of fit_holt_winters_numpy.
+    """
+    m = fit["s0"].shape[-1]
+    n = fit["level"].shape[-1]
+    h = np.arange(1, steps + 1)
+    base = fit["level"][:, -1:] + h * fit["trend"][:, -1:]
+    seasons = fit["season"][:, n + (h - 1) % m]
+    return base * seasons if seasonal == 'mul' else base + seasons
+
+class NumpyHoltWintersFit:
+    """
+    Single-series wrapper around fit_holt_winters_numpy, exposing the subset of the
+    statsmodels HoltWintersResults interface used by ForecastEngine
+    (fittedvalues, level, trend, season, params, sse, forecast()).
+    """
+
+    def __init__(self, series: pd.Series, seasonal: str = 'add', m: int = 12):
+        self.seasonal = seasonal
+        self._index = series.index
+        result = fit_holt_winters_numpy(series.to_numpy(dtype=float), seasonal=seasonal, m=m)
+        self._result = result
+        self.params = {
+            "smoothing_level": float(result["alpha"][0]),
+            "smoothing_trend": float(result["beta"][0]),
+            "smoothing_seasonal": float(result["gamma"][0]),
+            "initial_level": float(result["l0"][0]),
+            "initial_trend": float(result["b0"][0]),
+            "initial_seasons": result["s0"][0]
+        }
+        self.sse = float(result["sse"][0])
+        self.fittedvalues = pd.Series(result["fitted"][0], index=series.index)
+        self.resid = series - self.fittedvalues
+        self.level = pd.Series(result["level"][0], index=series.index)
+        self.trend = pd.Series(result["trend"][0], index=series.index)
+        # Season active at each observation (matches statsmodels' .season)
+        self.season = pd.Series(result["season"][0, m:], index=series.index)
+
+    def forecast(self, steps: int) -> pd.Series:
+        values = forecast_holt_winters_numpy(self._result, steps, self.seasonal)[0]
+        index = pd.date_range(start=self._index[-1], periods=steps + 1, freq='MS')[1:]
+        return pd.Series(values, index=index)
+
+    def simulate(self, nsimulations: int, anchor: str = 'end', repetitions: int = 1,
+                 random_errors: str = 'bootstrap', rng=None) -> np.ndarray:
+        """
+        Future sample paths (nsimulations, repetitions): the recursion is run forward from the
+        final states with additive errors resampled from the in-sample residuals,
+        all paths advancing together. Only the 'end' anchor and bootstrap errors are supported.
+        """
+        if anchor != 'end' or random_errors != 'bootstrap':
+            raise ValueError("NumPy Holt-Winters only simulates bootstrapped paths from the end of the sample")
+        rng = np.random.default_rng(rng)
+        result = self._result
+        m = result["s0"].shape[-1]
+        n = result["level"].shape[-1]
+        alpha, beta, gamma = result["alpha"][0], result["beta"][0], result["gamma"][0]
+        errors = rng.choice(self.resid.to_numpy(), size=(nsimulations, repetitions))
+
+        lvl = np.full(repetitions, result["level"][0, -1])
+        slope = np.full(repetitions, result["trend"][0, -1])
+        # Seasons of the last cycle, extended by one new season per simulated month
+        season = np.empty((nsimulations + m, repetitions))
+        season[:m] = result["season"][0, n:n + m, None]
+        paths = np.empty((nsimulations, repetitions))
+        for h in range(nsimulations):
+            s_prev = season[h]
+            base = lvl + slope
+            if self.seasonal == 'mul':
+                y = base * s_prev + errors[h]
+                new_lvl = alpha * (y / s_prev) + (1 - alpha) * base
+                season[h + m] = gamma * (y / base) + (1 - gamma) * s_prev
+            else:
+                y = base + s_prev + errors[h]
+                new_lvl = alpha * (y - s_prev) + (1 - alpha) * base
+                season[h + m] = gamma * (y - base) + (1 - gamma) * s_prev
+            slope = beta * (new_lvl - lvl) + (1 - beta) * slope
+            lvl = new_lvl
+            paths[h] = y
+        return paths
+
+# --- Model selection tournament (seasonality_mode='auto') ---
+
+SEASONAL_PERIODS = 12
+
+# name -> (minimum observations, needs strictly positive data, fit function)
+FORECAST_CANDIDATES = {
+    "hw_additive": (2 * SEASONAL_PERIODS, False, lambda s: ExponentialSmoothing(
+        s, seasonal_periods=SEASONAL_PERIODS, trend='add', seasonal='add', initialization_method="estimated").fit()),
+    "hw_multiplicative": (2 * SEASONAL_PERIODS, True, lambda s: ExponentialSmoothing(
+        s, seasonal_periods=SEASONAL_PERIODS, trend='add', seasonal='mul', initialization_method="estimated").fit()),
+    "hw_additive_damped": (2 * SEASONAL_PERIODS, False, lambda s: ExponentialSmoothing(
+        s, seasonal_periods=SEASONAL_PERIODS, trend='add', seasonal='add', damped_trend=True,
+        initialization_method="estimated").fit()),
+    "holt": (4, False, lambda s: ExponentialSmoothing(
+        s, trend='add', initialization_method="estimated").fit()),
+    "ets_mam": (2 * SEASONAL_PERIODS, True, lambda s: ETSModel(
+        s, error='mul', trend='add', seasonal='mul', seasonal_periods=SEASONAL_PERIODS).fit(disp=False)),
+    "arima_111": (8, False, lambda s: ARIMA(s, order=(1, 1, 1), trend='t').fit())
+}
+
+# Rolling-origin holdout: number of forecast origins, each scored over min(periods, 12) months
+HOLDOUT_ORIGINS = 3
+
+def candidate_is_eligible(name: str, series: pd.Series) -> bool:
+    min_obs, needs_positive, _ = FORECAST_CANDIDATES[name]
+    return len(series) >= min_obs and (not needs_positive or bool((series > 0).all()))
+
+def _parameter_count(fit) -> int:
+    # Holt-Winters results expose k; ETS / ARIMA results a params Series
+    k = getattr(fit, 'k', None)
+    return int(k) if k is not None else len(fit.params)
+
+def _aic_score(series: pd.Series, fit) -> float:
+    """
+    Gaussian AIC from one-step in-sample errors, n*log(SSE/n) + 2k, on the same window
+    for every candidate. The first observation is skipped: ARIMA's diffuse start
+    gives it a meaningless prediction.
+    """
+    errors = np.asarray(series)[1:] - np.asarray(fit.fittedvalues)[1:]
+    n = errors.size
+    sse = max(float(errors @ errors), 1e-12 * n)
+    return n * np.log(sse / n) + 2 * _parameter_count(fit)
 
 class ForecastEngine:
     
@@ -11,34 +428,253 @@ class ForecastEngine:
     def preprocess_data(dates: List[str], values: List[float]) -> pd.Series:
         """
         Convert to Pandas Series with Datetime Index.
-        Set frequency (MS).
-        Fill gaps with linear interpolation.
+        Set frequency (MS): observations are averaged per month.
+        Fill gaps with linear interpolation, edges with the nearest month.
         """
-        df = pd.DataFrame({'value': values}, index=pd.to_datetime(dates))
-        
-        # Sort just in case
-        df = df.sort_index()
-        
-        # Resample to Month Start ('MS') to handle gaps
-        # If input has missing months, this creates NaNs
-        df_resampled = df.resample('MS').mean()
-        
-        # Interpolate linear
-        df_filled = df_resampled.interpolate(method='linear')
-        
-        # If leading/trailing NaNs remain (e.g. empty start), fill?
-        # interpolation handles inside gaps. 
-        # bfill/ffill for edges
-        if df_filled['value'].isnull().any():
-            df_filled['value'] = df_filled['value'].fillna(method='bfill').fillna(method='ffill')
-            
-        return df_filled['value']
+        return ForecastEngine.preprocess_batch([dates], [values])[0]
+
+    @staticmethod
+    def preprocess_batch(dates_list: List[List[str]], values_list: List[List[float]]) -> List[pd.Series]:
+        """
+        preprocess_data for many series in one vectorized pass (e.g. daily transaction histories).
+        Returns one month-start Series per input, named 'value'.
+        """
+        lengths = np.array([len(values) for values in values_list], dtype=np.int64)
+        if len(dates_list) != len(values_list) or any(len(d) != n for d, n in zip(dates_list, lengths)):
+            raise ValueError("Each series needs exactly one date per value")
+        if np.any(lengths == 0):
+            raise ValueError("Cannot preprocess an empty series")
+
+        dates = np.concatenate([_to_datetime64(d) for d in dates_list])
+        values = np.concatenate([np.asarray(v, dtype=float) for v in values_list])
+        series_ids = np.repeat(np.arange(lengths.size), lengths)
+        months, filled, offsets = monthly_fill(dates, values, series_ids, lengths.size)
+
+        index = pd.DatetimeIndex(months.astype('datetime64[us]'))
+        return [
+            pd.Series(filled[start:end], index=pd.DatetimeIndex(index[start:end], freq='MS'), name='value')
+            for start, end in zip(offsets[:-1], offsets[1:])
+        ]
+
+    @staticmethod
+    def fit_holt_winters(series: pd.Series, seasonality_mode: str):
+        """
+        Fits additive-trend Holt-Winters with 12-month seasonality.
+        Falls back from multiplicative to additive seasonality if the fit fails
+        (e.g. zeros in the series).
+        """
+        freq = 12 # Monthly
+        try:
+            model = ExponentialSmoothing(
+                series,
+                seasonal_periods=freq,
+                trend='add',
+                seasonal=seasonality_mode,
+                initialization_method="estimated"
+            )
+            return model.fit()
+        except Exception as e:
+            if seasonality_mode == 'multiplicative':
+                model = ExponentialSmoothing(
+                    series,
+                    seasonal_periods=freq,
+                    trend='add',
+                    seasonal='add',
+                    initialization_method="estimated"
+                )
+                return model.fit()
+            raise e
+
+    @staticmethod
+    def fit_holt_winters_numpy(series: pd.Series, seasonality_mode: str) -> NumpyHoltWintersFit:
+        """
+        NumPy-kernel counterpart of fit_holt_winters, with the same
+        multiplicative -> additive fallback for non-positive data.
+        """
+        if seasonality_mode == 'multiplicative' and (series > 0).all():
+            return NumpyHoltWintersFit(series, seasonal='mul')
+        return NumpyHoltWintersFit(series, seasonal='add')
+
+    @staticmethod
+    def get_fitted_model(series: pd.Series, seasonality_mode: str, warm_start: bool = False,
+                         engine: str = "statsmodels"):
+        """
+        Fitted Holt-Winters model for a preprocessed series, served from FIT_CACHE when
+        the same series and mode were fitted before. Changing only the horizon or
+        a scenario multiplier then skips the optimizer entirely.
+        With warm_start, a cached fit of the series minus its last
+        1..WARM_START_MAX_NEW months is updated instead of refitting from scratch.
+        engine="numpy" uses the NumPy kernel (no warm start: a refit is already cheap).
+        """
+        key = series_fingerprint(series, seasonality_mode, engine)
+        fit = FIT_CACHE.get(key)
+        if fit is not None:
+            return fit
+
+        if engine == "numpy":
+            fit = ForecastEngine.fit_holt_winters_numpy(series, seasonality_mode)
+            FIT_CACHE.put(key, fit)
+            return fit
+
+        previous_fit = None
+        if warm_start:
+            for n_new in range(1, min(WARM_START_MAX_NEW, len(series) - 1) + 1):
+                previous_fit = FIT_CACHE.get(series_fingerprint(series.iloc[:-n_new], seasonality_mode), record=False)
+                if previous_fit is not None:
+                    break
+
+        if previous_fit is not None:
+            fit, _ = ForecastEngine.update_fitted_model(previous_fit, series, seasonality_mode)
+        else:
+            fit = ForecastEngine.fit_holt_winters(series, seasonality_mode)
+        FIT_CACHE.put(key, fit)
+        return fit
+
+    @staticmethod
+    def get_candidate_model(series: pd.Series, name: str):
+        """
+        Fitted tournament candidate, cached in FIT_CACHE like the fixed-mode models.
+        """
+        key = series_fingerprint(series, name, engine="tournament")
+        fit = FIT_CACHE.get(key)
+        if fit is None:
+            fit = FORECAST_CANDIDATES[name][2](series)
+            FIT_CACHE.put(key, fit)
+        return fit
 
     @staticmethod
-    def generate_forecast(input_data: ForecastInput) -> ForecastOutput:
+    def score_candidate(series: pd.Series, name: str, metric: str = "aic", horizon: int = 12) -> float:
+        """
+        Lower is better.
+        - aic: information criterion of the fit on the full series.
+        - holdout: mean absolute error of `horizon`-month forecasts from HOLDOUT_ORIGINS
+          rolling origins (the last one ending `horizon` months before the series end).
+        """
+        if metric == "aic":
+            return _aic_score(series, ForecastEngine.get_candidate_model(series, name))
+
+        errors = []
+        for origin in range(HOLDOUT_ORIGINS):
+            train_end = len(series) - horizon - origin
+            fit = ForecastEngine.get_candidate_model(series.iloc[:train_end], name)
+            actual = np.asarray(series.iloc[train_end:train_end + horizon])
+            errors.append(np.abs(actual - np.asarray(fit.forecast(horizon))))
+        return float(np.mean(errors))
+
+    @staticmethod
+    def select_model(series: pd.Series, metric: str = "aic", horizon: int = 12, max_workers: int = None) -> dict:
+        """
+        Fits every eligible FORECAST_CANDIDATES entry concurrently and keeps the best score.
+        Candidates the series is too short (or not positive enough) for are skipped;
+        if the holdout windows leave no candidate, the tournament falls back to AIC.
+        Candidates that fail to fit are dropped from the scores.
+        Returns: {model_name, fit, scores, metric}
+        """
+        horizon = min(horizon, SEASONAL_PERIODS)
+        if metric not in ("aic", "holdout"):
+            raise ValueError(f"Unknown selection metric '{metric}'")
+
+        if metric == "holdout":
+            shortest_train = series.iloc[:max(len(series) - horizon - (HOLDOUT_ORIGINS - 1), 0)]
+            names = [name for name in FORECAST_CANDIDATES if candidate_is_eligible(name, shortest_train)]
+            if not names:
+                metric = "aic"
+        if metric == "aic":
+            names = [name for name in FORECAST_CANDIDATES if candidate_is_eligible(name, series)]
+        if not names:
+            raise ValueError(f"Series of {len(series)} months is too short for any forecasting model")
+
+        # Threads: statsmodels spends most of its time in NumPy/SciPy, and the cache is shared
+        with ThreadPoolExecutor(max_workers=max_workers or len(names)) as pool:
+            futures = {name: pool.submit(ForecastEngine.score_candidate, series, name, metric, horizon) for name in names}
+
+        scores = {}
+        for name, future in futures.items():
+            try:
+                score = future.result()
+            except Exception:
+                continue
+            if np.isfinite(score):
+                scores[name] = float(score)
+        if not scores:
+            raise ValueError("No forecasting candidate could be fitted")
+
+        winner = min(scores, key=scores.get)
+        return {
+            "model_name": winner,
+            "fit": ForecastEngine.get_candidate_model(series, winner),
+            "scores": scores,
+            "metric": metric
+        }
+
+    @staticmethod
+    def simulate_forecast_paths(fit, steps: int, paths: int = 2000, seed: int = 42) -> np.ndarray:
+        """
+        Simulated future paths (steps, paths) from the fitted state-space recursion, in one
+        vectorized call. Exponential smoothing models resample their own residuals
+        (bootstrap); ARIMA draws Gaussian shocks.
+        """
+        kwargs = dict(nsimulations=steps, repetitions=paths, anchor='end', rng=np.random.default_rng(seed))
+        if not isinstance(getattr(fit, 'model', None), ARIMA):
+            kwargs['random_errors'] = 'bootstrap'
+        return np.asarray(fit.simulate(**kwargs), dtype=float).reshape(steps, paths)
+
+    @staticmethod
+    def update_fitted_model(previous_fit, series: pd.Series, seasonality_mode: str,
+                            drift_threshold: float = WARM_START_DRIFT_THRESHOLD):
+        """
+        Incremental update of a Holt-Winters fit when months are appended to its series.
+        The previous smoothing parameters and initial states are kept fixed
+        (no optimizer), which reproduces the old states exactly and carries
+        the recursion through the new observations.
+        If the one-step RMSE on the new months exceeds drift_threshold x the previous
+        in-sample RMSE, the model is fully re-optimized instead.
+        Returns: (fit, refitted)
+        """
+        n_prev = int(previous_fit.model.nobs)
+        if n_prev >= len(series):
+            raise ValueError("Warm start needs at least one new observation")
+
+        params = previous_fit.params
+        model = previous_fit.model
+        warm_model = ExponentialSmoothing(
+            series,
+            seasonal_periods=model.seasonal_periods,
+            trend=model.trend,
+            seasonal=model.seasonal,
+            damped_trend=model.damped_trend,
+            initialization_method="known",
+            initial_level=params['initial_level'],
+            initial_trend=params['initial_trend'],
+            initial_seasonal=params['initial_seasons']
+        )
+        fit_kwargs = dict(
+            smoothing_level=params['smoothing_level'],
+            smoothing_trend=params['smoothing_trend'],
+            smoothing_seasonal=params['smoothing_seasonal'],
+            optimized=False
+        )
+        if model.damped_trend:
+            fit_kwargs['damping_trend'] = params['damping_trend']
+        warm_fit = warm_model.fit(**fit_kwargs)
+
+        # Drift check: one-step errors on the appended months vs previous in-sample error
+        new_errors = np.asarray(series.iloc[n_prev:]) - np.asarray(warm_fit.fittedvalues)[n_prev:]
+        rmse_new = np.sqrt(np.mean(new_errors ** 2))
+        rmse_prev = np.sqrt(previous_fit.sse / n_prev)
+        # Perfectly fitted history (rmse_prev == 0): tolerate float noise only
+        tolerance = max(drift_threshold * rmse_prev, 1e-9 * float(np.abs(series).max()))
+
+        if rmse_new > tolerance:
+            return ForecastEngine.fit_holt_winters(series, seasonality_mode), True
+        return warm_fit, False
+
+    @staticmethod
+    def generate_forecast(input_data: ForecastInput, series: pd.Series = None, fit=None) -> ForecastOutput:
         
-        # 1. Preprocess
-        series = ForecastEngine.preprocess_data(input_data.dates, input_data.values)
+        # 1. Preprocess (callers that batch-preprocessed pass the monthly series directly)
+        if series is None:
+            series = ForecastEngine.preprocess_data(input_data.dates, input_data.values)
         
         # Verify length for seasonality
         # seasonal_decompose needs at least 2 cycles (24 months) usually
@@ -56,71 +692,50 @@ class ForecastEngine:
         # damped_trend is often good but prompt didn't strictly require it, 
         # though "growing revenue" implies trend.
         
-        try:
-            model = ExponentialSmoothing(
+        # Callers that manage their own fits (e.g. backtest folds) pass the fitted model directly
+        selection = None
+        if fit is None and input_data.seasonality_mode == 'auto':
+            selection = ForecastEngine.select_model(series, input_data.selection_metric, input_data.periods)
+            fit = selection["fit"]
+        elif fit is None:
+            fit = ForecastEngine.get_fitted_model(
                 series,
-                seasonal_periods=freq,
-                trend='add',
-                seasonal=input_data.seasonality_mode,
-                initialization_method="estimated"
+                input_data.seasonality_mode,
+                warm_start=input_data.warm_start,
+                engine=input_data.engine
             )
-            fit = model.fit()
-            forecast = fit.forecast(steps=input_data.periods)
-            fitted_values = fit.fittedvalues
-        except Exception as e:
-            # Fallback for insufficient data or flat line errors in mult mode?
-            # E.g. Multiplicative with zeros errors out.
-            # Fallback to additive if multiplicative fails
-            if input_data.seasonality_mode == 'multiplicative':
-                 model = ExponentialSmoothing(
-                    series,
-                    seasonal_periods=freq,
-                    trend='add',
-                    seasonal='add',
-                    initialization_method="estimated"
-                )
-                 fit = model.fit()
-                 forecast = fit.forecast(steps=input_data.periods)
-                 fitted_values = fit.fittedvalues
-            else:
-                raise e
+        forecast = fit.forecast(steps=input_data.periods)
+        fitted_values = fit.fittedvalues
 
-        # 3. Confidence Intervals (Simulation Wrapper / Formula)
-        # "Calculate std dev of residuals (History - Fitted)"
-        residuals = series - fitted_values
-        std_resid = residuals.std()
-        
-        # "Upper = Forecast + (1.96 * std_dev)"
-        # "Lower = Forecast - (1.96 * std_dev)"
-        # Note: This produces a constant band around the forecast. 
-        # Real uncertainty grows, but we follow the prompt's arithmetic.
-        
-        upper_bound = forecast + (1.96 * std_resid)
-        lower_bound = forecast - (1.96 * std_resid)
+        # 3. Prediction Intervals
+        forecast_quantiles = None
+        if input_data.interval_method == 'simulated':
+            # Quantiles of simulated paths: the band widens with the horizon
+            paths = ForecastEngine.simulate_forecast_paths(
+                fit, input_data.periods, input_data.simulation_paths, input_data.simulation_seed
+            )
+            levels = sorted(set(input_data.quantiles) | {0.025, 0.975})
+            quantile_rows = dict(zip(levels, np.quantile(paths, levels, axis=1)))
+            lower_bound = quantile_rows[0.025]
+            upper_bound = quantile_rows[0.975]
+            forecast_quantiles = {f"{q:g}": quantile_rows[q].tolist() for q in input_data.quantiles}
+        else:
+            # Constant band: Forecast +/- 1.96 * std dev of residuals (History - Fitted)
+            std_resid = (series - fitted_values).std()
+            upper_bound = forecast + (1.96 * std_resid)
+            lower_bound = forecast - (1.96 * std_resid)
         
         # 4. Decomposition
-        # statsmodels.tsa.seasonal.seasonal_decompose
-        # Requires dense data.
-        try:
-            # Decompose supports 'additive' or 'multiplicative'
-            # We match the seasonality mode or default to additive
-            decomp_model = input_data.seasonality_mode
-            if decomp_model not in ['additive', 'multiplicative']:
-                decomp_model = 'additive'
-            
-            # Decompose
-            decomposition = seasonal_decompose(series, model=decomp_model, period=freq)
-            
-            # Handle NaNs in trend/seasonal (ends of series)
-            trend_comp = decomposition.trend.fillna(method='bfill').fillna(method='ffill')
-            seasonal_comp = decomposition.seasonal.fillna(method='bfill').fillna(method='ffill')
-            
-        except Exception:
-            # If decomp fails (too short?), return 0s
-            trend_comp = pd.Series(0, index=series.index)
-            seasonal_comp = pd.Series(0, index=series.index)
-            # Maybe just original series as trend?
-            trend_comp = series
+        # Default: classical seasonal_decompose pass. decomposition='model' reads level / slope /
+        # season straight from the fitted states; models without states (ARIMA) fall back to classical.
+        residuals = series - fitted_values
+        components = _state_components(fit, input_data.seasonality_mode) if input_data.decomposition == 'model' else None
+        slope_list = None
+        if components is not None:
+            trend_comp, slope_comp, seasonal_comp = components
+            slope_list = slope_comp.tolist()
+        else:
+            trend_comp, seasonal_comp = _classical_decomposition(series, input_data.seasonality_mode, freq)
 
         # 5. Format Output
         
@@ -140,5 +755,107 @@ class ForecastEngine:
             lower_bound=lower_bound.tolist(),
             upper_bound=upper_bound.tolist(),
             trend=trend_list,
-            seasonal=seasonal_list
+            seasonal=seasonal_list,
+            slope=slope_list,
+            residuals=residuals.tolist(),
+            forecast_quantiles=forecast_quantiles,
+            model_name=selection["model_name"] if selection else None,
+            model_scores=selection["scores"] if selection else None,
+            selection_metric=selection["metric"] if selection else None
         )
+
+    @staticmethod
+    def generate_forecast_batch(
+        inputs: Iterable[ForecastInput],
+        max_workers: int = None,
+        chunk_size: int = 8
+    ) -> Iterator[BatchForecastResult]:
+        """
+        Forecasts many series across a process pool.
+        Series are sent to workers in chunks of `chunk_size` to amortise pickling.
+        Results are yielded as chunks complete (not in input order; use `.index`).
+        A failing series yields a result with `error` set instead of stopping the batch.
+        max_workers=1 runs inline without a pool.
+        """
+        items = list(enumerate(inputs))
+        chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+
+        if max_workers == 1:
+            for chunk in chunks:
+                yield from _forecast_chunk(chunk)
+            return
+
+        pool = ProcessPoolExecutor(max_workers=max_workers)
+        try:
+            futures = {pool.submit(_forecast_chunk, chunk): chunk for chunk in chunks}
+            for future in as_completed(futures):
+                try:
+                    results = future.result()
+                except Exception as e:
+                    # Worker died (e.g. BrokenProcessPool): fail only this chunk's series
+                    results = [
+                        BatchForecastResult(index=index, error=f"{type(e).__name__}: {e}")
+                        for index, _ in futures[future]
+                    ]
+                yield from results
+        finally:
+            # Also runs if the caller stops iterating early
+            pool.shutdown(wait=True, cancel_futures=True)
+
+def _state_components(fit, seasonality_mode: str = 'additive'):
+    """
+    (level, slope, season) Series from a fitted exponential smoothing model's states,
+    or None when the model has none (e.g. ARIMA).
+    Holt-Winters results name the slope state `trend`; ETS results call it `slope`.
+    The season is in the fit's own form: offsets, or factors for multiplicative seasonality.
+    Non-seasonal models (e.g. holt) get the neutral season of the requested mode:
+    ones for 'multiplicative', zeros otherwise.
+    """
+    level = getattr(fit, 'level', None)
+    if not isinstance(level, pd.Series):
+        return None
+    slope = getattr(fit, 'slope', None)
+    if not isinstance(slope, pd.Series):
+        slope = getattr(fit, 'trend', None)
+    if not isinstance(slope, pd.Series):
+        slope = pd.Series(0.0, index=level.index)
+
+    # NumpyHoltWintersFit is always seasonal; statsmodels models say so on .model.seasonal
+    seasonal_kind = getattr(fit, 'seasonal', None) or getattr(getattr(fit, 'model', None), 'seasonal', None)
+    season = getattr(fit, 'season', None)
+    if seasonal_kind is None or not isinstance(season, pd.Series):
+        season = pd.Series(1.0 if seasonality_mode == 'multiplicative' else 0.0, index=level.index)
+    return level, slope, season
+
+def _classical_decomposition(series: pd.Series, seasonality_mode: str, freq: int = 12):
+    """
+    (trend, seasonal) from statsmodels seasonal_decompose, edges filled.
+    Falls back to trend = series, seasonal = 0 if the series is too short.
+    """
+    # Decompose supports 'additive' or 'multiplicative'; 'auto' decomposes additively
+    decomp_model = seasonality_mode if seasonality_mode in ('additive', 'multiplicative') else 'additive'
+    try:
+        decomposition = seasonal_decompose(series, model=decomp_model, period=freq)
+    except Exception:
+        return series, pd.Series(0.0, index=series.index)
+    # Moving-average trend is NaN at both ends
+    return decomposition.trend.bfill().ffill(), decomposition.seasonal.bfill().ffill()
+
+def _forecast_chunk(chunk: List[Tuple[int, ForecastInput]]) -> List[BatchForecastResult]:
+    """
+    Worker task: forecasts each series of a chunk, isolating per-series failures.
+    """
+    # One vectorized preprocessing pass per chunk; per-series on failure (e.g. a bad date)
+    try:
+        prepared = ForecastEngine.preprocess_batch([item.dates for _, item in chunk], [item.values for _, item in chunk])
+    except Exception:
+        prepared = [None] * len(chunk)
+
+    results = []
+    for (index, input_data), series in zip(chunk, prepared):
+        try:
+            output = ForecastEngine.generate_forecast(input_data, series=series)
+            results.append(BatchForecastResult(index=index, output=output))
+        except Exception as e:
+            results.append(BatchForecastResult(index=index, error=f"{type(e).__name__}: {e}"))
+    return results
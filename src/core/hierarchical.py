@@ -0,0 +1,203 @@
+import pandas as pd
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import LinearOperator, cg
+from src.core.forecasting import ForecastEngine
+from src.models.forecast_schemas import ForecastInput
+
+RECONCILIATION_METHODS = ("bottom_up", "top_down", "ols", "mint")
+
+class HierarchicalForecastEngine:
+    """
+    Forecasts for a Total -> department -> gl_code hierarchy that add up.
+    Every node is forecast independently (in parallel), then the base forecasts are
+    reconciled through the sparse summing matrix S (nodes x leaves): y_node = S @ y_leaf.
+    """
+
+    @staticmethod
+    def build_hierarchy(keys: pd.DataFrame) -> dict:
+        """
+        keys: DataFrame with 'department' and 'gl_code' columns (duplicates allowed).
+        Returns:
+            nodes: DataFrame (node_id, level, department, gl_code), Total first, then departments, then leaves
+            S: CSR summing matrix (n_nodes x n_leaves)
+            leaves: DataFrame of (department, gl_code) in leaf-column order
+        """
+        leaves = (
+            keys[['department', 'gl_code']].drop_duplicates()
+            .sort_values(['department', 'gl_code']).reset_index(drop=True)
+        )
+        n_leaves = len(leaves)
+        if n_leaves == 0:
+            raise ValueError("Hierarchy needs at least one department/gl_code pair")
+
+        departments, dept_of_leaf = np.unique(leaves['department'].to_numpy(), return_inverse=True)
+        total_row = sp.csr_matrix(np.ones((1, n_leaves)))
+        dept_rows = sp.csr_matrix(
+            (np.ones(n_leaves), (dept_of_leaf, np.arange(n_leaves))), shape=(len(departments), n_leaves)
+        )
+        S = sp.vstack([total_row, dept_rows, sp.identity(n_leaves, format='csr')], format='csr')
+
+        nodes = pd.concat([
+            pd.DataFrame({'node_id': ['Total'], 'level': ['total'], 'department': [None], 'gl_code': [None]}),
+            pd.DataFrame({'node_id': departments, 'level': 'department', 'department': departments, 'gl_code': None}),
+            pd.DataFrame({
+                'node_id': leaves['department'].astype(str) + ' | ' + leaves['gl_code'].astype(str),
+                'level': 'gl_code',
+                'department': leaves['department'],
+                'gl_code': leaves['gl_code']
+            })
+        ], ignore_index=True)
+        return {"nodes": nodes, "S": S, "leaves": leaves}
+
+    @staticmethod
+    def aggregate(df: pd.DataFrame, hierarchy: dict) -> tuple:
+        """
+        Monthly history of every node from leaf-level rows
+        (department, gl_code, month, amount). Missing leaf months count as 0.
+        Returns: (months as month-start DatetimeIndex, Y of shape n_nodes x n_months)
+        """
+        frame = df.assign(month=pd.to_datetime(df['month']).dt.to_period('M').dt.to_timestamp())
+        pivot = frame.pivot_table(index=['department', 'gl_code'], columns='month', values='amount', aggfunc='sum', fill_value=0.0)
+        months = pd.date_range(pivot.columns.min(), pivot.columns.max(), freq='MS')
+        leaf_index = pd.MultiIndex.from_frame(hierarchy["leaves"])
+        Y_leaf = pivot.reindex(index=leaf_index, columns=months, fill_value=0.0).to_numpy(dtype=float)
+        return months, np.asarray(hierarchy["S"] @ Y_leaf)
+
+    @staticmethod
+    def forecast_nodes(
+        months: pd.DatetimeIndex,
+        Y: np.ndarray,
+        horizon: int = 12,
+        seasonality_mode: str = "additive",
+        engine: str = "statsmodels",
+        max_workers: int = None
+    ) -> tuple:
+        """
+        Base forecasts for every node via ForecastEngine.generate_forecast_batch (process pool).
+        Nodes whose model cannot be fitted (e.g. history shorter than two seasons)
+        fall back to a naive last-value forecast with random-walk residuals.
+        Returns: (base forecasts n_nodes x horizon, in-sample residuals n_nodes x n_months)
+        """
+        dates = [d.strftime('%Y-%m-%d') for d in months]
+        inputs = [
+            ForecastInput(
+                dates=dates,
+                values=row.tolist(),
+                periods=horizon,
+                seasonality_mode=seasonality_mode,
+                engine=engine,
+                # Point forecasts and residuals only
+                interval_method='constant'
+            )
+            for row in Y
+        ]
+
+        base = np.empty((Y.shape[0], horizon))
+        residuals = np.empty_like(Y)
+        for result in ForecastEngine.generate_forecast_batch(inputs, max_workers=max_workers):
+            i = result.index
+            if result.output is not None:
+                base[i] = result.output.forecast_values
+                residuals[i] = result.output.residuals
+            else:
+                base[i] = Y[i, -1]
+                residuals[i] = np.diff(Y[i], prepend=Y[i, 0])
+        return base, residuals
+
+    @staticmethod
+    def reconcile(
+        base: np.ndarray,
+        S: sp.spmatrix,
+        method: str = "mint",
+        residuals: np.ndarray = None,
+        history: np.ndarray = None,
+        tol: float = 1e-10
+    ) -> np.ndarray:
+        """
+        Coherent forecasts S @ leaf_forecasts (n_nodes x horizon) from base forecasts of every node.
+        - bottom_up: leaves keep their own base forecasts.
+        - top_down: the Total forecast is split by each leaf's share of historical totals (needs history).
+        - ols / mint: generalized least squares projection
+              y~ = S (S' W^-1 S)^-1 S' W^-1 y^
+          with W = I (ols) or W = diag(in-sample residual variance) (mint, diagonal
+          covariance so it scales; needs residuals).
+          S' W^-1 S is never formed (the Total row makes it dense): the normal equations are
+          solved per horizon by Jacobi-preconditioned conjugate gradient on a LinearOperator.
+        """
+        if method not in RECONCILIATION_METHODS:
+            raise ValueError(f"Unknown reconciliation method '{method}'")
+        S = sp.csr_matrix(S, dtype=float)
+        n_nodes, n_leaves = S.shape
+        base = np.asarray(base, dtype=float)
+
+        if method == "bottom_up":
+            leaf = base[n_nodes - n_leaves:]
+        elif method == "top_down":
+            if history is None:
+                raise ValueError("top_down reconciliation needs the node history")
+            leaf_history = np.asarray(history, dtype=float)[n_nodes - n_leaves:]
+            total = leaf_history.sum()
+            shares = leaf_history.sum(axis=1) / total if total != 0 else np.full(n_leaves, 1.0 / n_leaves)
+            leaf = shares[:, None] * base[0]
+        else:
+            if method == "mint":
+                if residuals is None:
+                    raise ValueError("mint reconciliation needs in-sample residuals")
+                variance = np.var(np.asarray(residuals, dtype=float), axis=1)
+                # Perfectly fitted nodes would get infinite weight: floor at a tiny share of the mean variance
+                w_inv = 1.0 / np.maximum(variance, 1e-9 * max(variance.mean(), 1e-12))
+            else:
+                w_inv = np.ones(n_nodes)
+
+            St_Winv = S.T.multiply(w_inv).tocsr() # n_leaves x n_nodes
+            normal = LinearOperator((n_leaves, n_leaves), matvec=lambda x: St_Winv @ (S @ x), dtype=float)
+            diagonal = np.asarray(St_Winv.multiply(S.T).sum(axis=1)).ravel()
+            preconditioner = LinearOperator((n_leaves, n_leaves), matvec=lambda x: x / diagonal, dtype=float)
+
+            rhs = St_Winv @ base
+            leaf = np.empty((n_leaves, base.shape[1]))
+            for h in range(base.shape[1]):
+                # Warm start from bottom-up, which is already close for most leaves
+                solution, info = cg(normal, rhs[:, h], x0=base[n_nodes - n_leaves:, h], rtol=tol, atol=0.0,
+                                    maxiter=10 * n_leaves, M=preconditioner)
+                if info != 0:
+                    raise RuntimeError(f"Reconciliation did not converge for horizon {h + 1}")
+                leaf[:, h] = solution
+
+        return np.asarray(S @ leaf)
+
+    @staticmethod
+    def run_hierarchical_forecast(
+        df: pd.DataFrame,
+        horizon: int = 12,
+        method: str = "mint",
+        seasonality_mode: str = "additive",
+        engine: str = "statsmodels",
+        max_workers: int = None
+    ) -> pd.DataFrame:
+        """
+        End to end: leaf rows (department, gl_code, month, amount) -> coherent forecasts.
+        Returns a tidy DataFrame, one row per (node, month):
+            node_id, level, department, gl_code, month, base_forecast, forecast
+        """
+        hierarchy = HierarchicalForecastEngine.build_hierarchy(df)
+        months, Y = HierarchicalForecastEngine.aggregate(df, hierarchy)
+        base, residuals = HierarchicalForecastEngine.forecast_nodes(
+            months, Y, horizon, seasonality_mode, engine, max_workers
+        )
+        reconciled = HierarchicalForecastEngine.reconcile(
+            base, hierarchy["S"], method, residuals=residuals, history=Y
+        )
+
+        future = pd.date_range(months[-1], periods=horizon + 1, freq='MS')[1:]
+        nodes = hierarchy["nodes"]
+        return pd.DataFrame({
+            'node_id': np.repeat(nodes['node_id'].to_numpy(), horizon),
+            'level': np.repeat(nodes['level'].to_numpy(), horizon),
+            'department': np.repeat(nodes['department'].to_numpy(), horizon),
+            'gl_code': np.repeat(nodes['gl_code'].to_numpy(), horizon),
+            'month': np.tile(future.strftime('%Y-%m-%d').to_numpy(), len(nodes)),
+            'base_forecast': base.ravel(),
+            'forecast': reconciled.ravel()
+        })
@@ -0,0 +1,179 @@
+import os
+import re
+import shutil
+import uuid
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+import pyarrow.parquet as pq
+from typing import List, Optional, Sequence
+
+# Root of the local store; one Parquet dataset partitioned source=<name>/period=<YYYY-MM>
+STAGING_STORE_PATH = os.getenv("STAGING_STORE_PATH", "staging")
+
+# Partition of rows without a (parseable) date
+UNDATED_PERIOD = "undated"
+
+# Schema of every column ever written, kept at the store root (dataset discovery skips '_' files)
+SCHEMA_FILE = "_common_metadata"
+
+PARTITIONING = ds.partitioning(pa.schema([("source", pa.string()), ("period", pa.string())]), flavor="hive")
+
+class StagingStore:
+    """
+    Columnar store of cleaned imports (output of SmartImporter), so engines can load
+    just the columns and months they need instead of re-running the ETL.
+    Files are Parquet, partitioned by source system and month of the 'date' column;
+    reads go through a memory-mapped local filesystem and only open the partitions
+    that pass the source / period filters. The merged column schema is maintained at
+    write time, so reads never scan other partitions' footers.
+    """
+
+    def __init__(self, root: str = STAGING_STORE_PATH):
+        self.root = os.path.abspath(root)
+        self.filesystem = pafs.LocalFileSystem(use_mmap=True)
+
+    def write(self, df: pd.DataFrame, source: str, mode: str = "overwrite") -> List[str]:
+        """
+        Stores a cleaned DataFrame under `source`, one file per month it covers.
+        mode='overwrite' replaces those months of the source (re-importing a file is idempotent),
+        mode='append' adds to them.
+        Returns: the periods written.
+        """
+        if mode not in ("overwrite", "append"):
+            raise ValueError(f"Unknown write mode '{mode}'")
+        periods = StagingStore._periods(df)
+        self._merge_schema(pa.Schema.from_pandas(df, preserve_index=False))
+        written = []
+        for period, part in df.groupby(periods, sort=True):
+            directory = self._partition_dir(source, period)
+            if mode == "overwrite" and os.path.isdir(directory):
+                shutil.rmtree(directory)
+            os.makedirs(directory, exist_ok=True)
+            table = pa.Table.from_pandas(part, preserve_index=False)
+            ds.write_dataset(
+                table, directory, format="parquet",
+                basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+                existing_data_behavior="overwrite_or_ignore"
+            )
+            written.append(period)
+        return written
+
+    def sink(self, source: str) -> "StagingSink":
+        """
+        Callable for SmartImporter.stream_import: each month is replaced the first time
+        a chunk touches it, later chunks append to it.
+        """
+        return StagingSink(self, source)
+
+    def read(
+        self,
+        source=None,
+        columns: Optional[Sequence[str]] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None
+    ) -> pd.DataFrame:
+        """
+        Loads stored rows.
+        source: one name, a list of names or None for all sources.
+        columns: data columns to load (None = all); 'source' and 'period' are always included.
+        start / end: inclusive 'YYYY-MM' bounds; undated rows are excluded once a bound is set.
+        """
+        dataset = self._dataset()
+        if dataset is None:
+            return pd.DataFrame(columns=["source", "period", *(columns or [])])
+
+        condition = None
+        if source is not None:
+            sources = [source] if isinstance(source, str) else list(source)
+            condition = ds.field("source").isin(sources)
+        if start is not None or end is not None:
+            bounds = ds.field("period") != UNDATED_PERIOD
+            if start is not None:
+                bounds &= ds.field("period") >= StagingStore._period(start)
+            if end is not None:
+                bounds &= ds.field("period") <= StagingStore._period(end)
+            condition = bounds if condition is None else condition & bounds
+
+        selected = None if columns is None else ["source", "period", *[c for c in columns if c not in ("source", "period")]]
+        table = dataset.to_table(columns=selected, filter=condition)
+        return table.to_pandas()
+
+    def partitions(self) -> pd.DataFrame:
+        """
+        One row per stored (source, period) with its row count, from the file footers only.
+        """
+        dataset = self._dataset()
+        if dataset is None:
+            return pd.DataFrame(columns=["source", "period", "rows"])
+        counts = {}
+        for fragment in dataset.get_fragments():
+            key = tuple(ds.get_partition_keys(fragment.partition_expression)[k] for k in ("source", "period"))
+            counts[key] = counts.get(key, 0) + fragment.count_rows()
+        return pd.DataFrame(
+            [(s, p, n) for (s, p), n in sorted(counts.items())], columns=["source", "period", "rows"]
+        )
+
+    def monthly_series(self, source, column: str, start: Optional[str] = None, end: Optional[str] = None) -> pd.Series:
+        """
+        Monthly totals of one stored column (month-start index), e.g. revenue history for
+        ForecastInput without touching the other columns.
+        """
+        df = self.read(source, columns=["date", column], start=start, end=end)
+        df = df.dropna(subset=["date"])
+        months = pd.to_datetime(df["date"]).dt.to_period("M").dt.to_timestamp()
+        return df[column].groupby(months).sum().rename(column)
+
+    def _dataset(self):
+        schema = self._stored_schema()
+        if schema is None:
+            return None
+        schema = pa.unify_schemas([schema, PARTITIONING.schema])
+        return ds.dataset(self.root, schema=schema, format="parquet", partitioning=PARTITIONING, filesystem=self.filesystem)
+
+    def _stored_schema(self):
+        path = os.path.join(self.root, SCHEMA_FILE)
+        return pq.read_schema(path) if os.path.exists(path) else None
+
+    def _merge_schema(self, schema: pa.Schema) -> None:
+        # Chunks may disagree on types (e.g. an all-empty column written as null): promote once here
+        schema = schema.remove_metadata()
+        stored = self._stored_schema()
+        merged = schema if stored is None else pa.unify_schemas([stored, schema], promote_options="permissive")
+        if stored is None or not merged.equals(stored):
+            os.makedirs(self.root, exist_ok=True)
+            pq.write_metadata(merged, os.path.join(self.root, SCHEMA_FILE))
+
+    def _partition_dir(self, source: str, period: str) -> str:
+        if not source or re.search(r'[/\\=]', source) or source in (".", ".."):
+            raise ValueError(f"Invalid source name '{source}'")
+        return os.path.join(self.root, f"source={source}", f"period={period}")
+
+    @staticmethod
+    def _periods(df: pd.DataFrame) -> pd.Series:
+        if "date" not in df.columns:
+            return pd.Series(UNDATED_PERIOD, index=df.index)
+        dates = pd.to_datetime(df["date"], errors="coerce")
+        return dates.dt.strftime("%Y-%m").fillna(UNDATED_PERIOD)
+
+    @staticmethod
+    def _period(value) -> str:
+        return pd.Timestamp(value).strftime("%Y-%m")
+
+class StagingSink:
+    """
+    Write target of one import: see StagingStore.sink.
+    """
+
+    def __init__(self, store: StagingStore, source: str):
+        self.store = store
+        self.source = source
+        self.periods = set()
+
+    def __call__(self, chunk: pd.DataFrame) -> None:
+        periods = StagingStore._periods(chunk)
+        for period, part in chunk.groupby(periods, sort=True):
+            mode = "append" if period in self.periods else "overwrite"
+            self.store.write(part, self.source, mode=mode)
+            self.periods.add(period)
@@ -0,0 +1,123 @@
+import numpy as np
+
+class StreamingSummary:
+    """
+    Running statistics over a stream of simulated values, in constant memory.
+    - Mean / Variance: Chan et al. pairwise update (exact, numerically stable).
+    - Quantiles / Histogram: fixed-range fine histogram sketch.
+      Quantile error is at most one sketch bin; values outside [lower, upper]
+      are counted as under/overflow and only affect min/max.
+    Summaries built with the same range can be merged (e.g. across workers).
+    """
+
+    def __init__(self, lower: float, upper: float, sketch_bins: int = 4096, threshold: float = 0.0):
+        if not upper > lower:
+            raise ValueError("Sketch range must have upper > lower")
+        self.lower = float(lower)
+        self.upper = float(upper)
+        self.threshold = float(threshold)
+        self.sketch_counts = np.zeros(sketch_bins, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0 # Sum of squared deviations
+        self.below_threshold = 0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=float).ravel()
+        n = values.size
+        if n == 0:
+            return
+
+        self._combine_moments(n, float(values.mean()), float(((values - values.mean()) ** 2).sum()))
+        self.below_threshold += int(np.count_nonzero(values < self.threshold))
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+        # Sketch: bin index by linear scaling (faster than np.histogram's searchsorted)
+        n_bins = self.sketch_counts.size
+        idx = np.floor((values - self.lower) * (n_bins / (self.upper - self.lower))).astype(np.int64)
+        self.underflow += int(np.count_nonzero(idx < 0))
+        self.overflow += int(np.count_nonzero(idx >= n_bins))
+        in_range = idx[(idx >= 0) & (idx < n_bins)]
+        self.sketch_counts += np.bincount(in_range, minlength=n_bins)
+
+    def merge(self, other: "StreamingSummary") -> "StreamingSummary":
+        if (other.lower, other.upper, other.sketch_counts.size) != (self.lower, self.upper, self.sketch_counts.size):
+            raise ValueError("Cannot merge summaries with different sketch ranges")
+        if other.count == 0:
+            return self
+
+        self._combine_moments(other.count, other.mean, other.m2)
+        self.below_threshold += other.below_threshold
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.sketch_counts += other.sketch_counts
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+        return self
+
+    def _combine_moments(self, n_b: int, mean_b: float, m2_b: float) -> None:
+        n_a = self.count
+        n = n_a + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / n
+        self.m2 += m2_b + delta ** 2 * n_a * n_b / n
+        self.count = n
+
+    @property
+    def variance(self) -> float:
+        # Sample variance (ddof=1)
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.variance))
+
+    @property
+    def edges(self) -> np.ndarray:
+        return np.linspace(self.lower, self.upper, self.sketch_counts.size + 1)
+
+    def quantile(self, q: float) -> float:
+        """
+        Approximate quantile from the sketch, interpolating linearly inside a bin.
+        """
+        if self.count == 0:
+            return float('nan')
+        rank = q * self.count
+        if rank <= self.underflow:
+            return self.min
+        if rank >= self.count - self.overflow:
+            return self.max
+
+        cumulative = self.underflow + np.cumsum(self.sketch_counts)
+        b = int(np.searchsorted(cumulative, rank))
+        before = cumulative[b] - self.sketch_counts[b]
+        fraction = (rank - before) / self.sketch_counts[b]
+        edges = self.edges
+        return float(edges[b] + fraction * (edges[b + 1] - edges[b]))
+
+    def histogram(self, bins: int = 50, lower: float = None, upper: float = None) -> dict:
+        """
+        Coarse display histogram built by re-binning the sketch.
+        lower / upper narrow the displayed range (snapped outward to sketch bin edges);
+        sketch counts left outside it are reported as under/overflow.
+        """
+        n_fine = self.sketch_counts.size
+        width = (self.upper - self.lower) / n_fine
+        first = 0 if lower is None else int(np.clip(np.floor((lower - self.lower) / width), 0, n_fine - 1))
+        last = n_fine if upper is None else int(np.clip(np.ceil((upper - self.lower) / width), first + 1, n_fine))
+
+        window = self.sketch_counts[first:last]
+        bins = min(bins, window.size)
+        boundaries = np.round(np.linspace(0, window.size, bins + 1)).astype(int)
+        counts = np.add.reduceat(window, boundaries[:-1])
+        return {
+            "edges": self.edges[first + boundaries].tolist(),
+            "counts": counts.tolist(),
+            "underflow": self.underflow + int(self.sketch_counts[:first].sum()),
+            "overflow": self.overflow + int(self.sketch_counts[last:].sum())
+        }
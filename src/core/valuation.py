@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Dict, Sequence, Tuple, Union
 import numpy as np
 from src.models.schemas import FinancialInput
 
@@ -64,71 +64,145 @@ def calculate_dcf(data: FinancialInput) -> Dict[str, float]:
         "cash_flows": fcfs.tolist() # Return calculated/parsed flows
     }
 
-def run_sensitivity_analysis(data: FinancialInput) -> np.ndarray:
+def _pack_cash_flows(streams: Sequence[Sequence[float]]) -> Tuple[np.ndarray, np.ndarray]:
     """
-    Varies WACC (+/- 2%) and Growth Rate (+/- 1%).
+    Packs ragged cash-flow streams into a zero-padded matrix.
+    Returns (matrix of shape (n_streams, max_years), lengths per stream).
+    """
+    lengths = np.array([len(s) for s in streams], dtype=np.int64)
+    if len(lengths) == 0 or np.any(lengths == 0):
+        raise ValueError("Every cash-flow stream must contain at least one flow")
+
+    matrix = np.zeros((len(streams), lengths.max()))
+    # Column mask: True where year index < stream length
+    mask = np.arange(lengths.max()) < lengths[:, None]
+    matrix[mask] = np.concatenate([np.asarray(s, dtype=float) for s in streams])
+    return matrix, lengths
+
+def calculate_dcf_batch(
+    cash_flows: Sequence[Sequence[float]],
+    wacc: Union[float, Sequence[float]],
+    terminal_growth_rate: Union[float, Sequence[float]]
+) -> Dict[str, np.ndarray]:
+    """
+    Vectorized DCF over many explicit cash-flow streams in one pass.
+    Streams may have different lengths; WACC and terminal growth may be
+    scalars or one value per stream. Matches `calculate_dcf` row by row.
+    """
+    fcfs, years = _pack_cash_flows(cash_flows)
+    n_streams, max_years = fcfs.shape
+
+    wacc = np.broadcast_to(np.asarray(wacc, dtype=float), (n_streams,))
+    g_term = np.broadcast_to(np.asarray(terminal_growth_rate, dtype=float), (n_streams,))
+    if np.any(g_term >= wacc):
+        raise ValueError("Terminal growth cannot exceed WACC")
+
+    # Discount matrix: (1 + wacc_i) ** t for t = 1..max_years
+    projected_years = np.arange(1, max_years + 1)
+    discount_factors = (1 + wacc[:, None]) ** projected_years
+
+    # Padded years hold 0.0 so they add nothing to the sum
+    npv_fcf = np.sum(fcfs / discount_factors, axis=1)
+
+    # Terminal Value on each stream's own final year
+    rows = np.arange(n_streams)
+    fcf_final = fcfs[rows, years - 1]
+    terminal_value = fcf_final * (1 + g_term) / (wacc - g_term)
+    pv_terminal_value = terminal_value / discount_factors[rows, years - 1]
+
+    enterprise_value = npv_fcf + pv_terminal_value
+
+    return {
+        "npv": npv_fcf,
+        "pv_terminal_value": pv_terminal_value,
+        "enterprise_value": enterprise_value,
+        "equity_value": enterprise_value.copy()
+    }
+
+def _resolve_base_fcfs(data: FinancialInput) -> np.ndarray:
+    """
+    Base free cash flows used by the sensitivity engine.
+    Explicit flows are used as-is; revenue mode projects 5 years at the base growth rate.
     """
-    # Base values
-    base_wacc = data.wacc
-    base_growth = data.growth_rate_projection # Usually 0.0 if explicit flows used, or user provided 'implicit' growth?
-    
-    # If using explicit cash flows, what does "varying growth" mean?
-    # We will treat `base_growth` as 0.0 relative to the provided flows, 
-    # and applying delta means scaling the provided flows?
-    # Or we assume the provided flows HAVE a growth rate embedded and we adjust it?
-    # Simplest: "Scenario Growth". New Flow_t = Base_Flow_t * (1 + g_scenario)^t.
-    
-    # Ranges
-    wacc_steps = np.linspace(base_wacc - 0.02, base_wacc + 0.02, 5)
-    growth_steps = np.linspace(base_growth - 0.01, base_growth + 0.01, 5)
-    
-    W, G = np.meshgrid(wacc_steps, growth_steps, indexing='ij')
-    
-    ev_matrix = np.zeros_like(W)
-    
-    # Resolve Base Flows
     if data.cash_flows:
-        base_fcfs = np.array(data.cash_flows)
-    elif data.revenue_historical:
+        return np.array(data.cash_flows, dtype=float)
+    if data.revenue_historical:
         last_revenue = data.revenue_historical[-1]
         years = 5
-        base_revenues = last_revenue * ((1 + base_growth) ** np.arange(1, years + 1))
+        base_revenues = last_revenue * ((1 + data.growth_rate_projection) ** np.arange(1, years + 1))
         FCF_MARGIN = 0.20
-        base_fcfs = base_revenues * FCF_MARGIN
-    else:
-        return np.zeros((5,5))
+        return base_revenues * FCF_MARGIN
+    return np.array([])
+
+def build_sensitivity_axes(
+    data: FinancialInput,
+    wacc_spread: float = 0.02,
+    growth_spread: float = 0.01,
+    wacc_points: int = 5,
+    growth_points: int = 5
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Evenly spaced WACC and Growth axes centred on the base case.
+    """
+    wacc_axis = np.linspace(data.wacc - wacc_spread, data.wacc + wacc_spread, wacc_points)
+    growth_axis = np.linspace(data.growth_rate_projection - growth_spread,
+                              data.growth_rate_projection + growth_spread, growth_points)
+    return wacc_axis, growth_axis
+
+def run_sensitivity_surface(
+    data: FinancialInput,
+    wacc_axis: Sequence[float],
+    growth_axis: Sequence[float],
+    terminal_growth_axis: Sequence[float] = None
+) -> np.ndarray:
+    """
+    Enterprise Value over an arbitrary WACC x Growth (x Terminal Growth) grid.
+    Fully broadcast, no loop over years.
+    Returns shape (len(wacc_axis), len(growth_axis)) or, when a terminal growth
+    axis is given, (len(wacc_axis), len(growth_axis), len(terminal_growth_axis)).
+    Grid points where WACC <= terminal growth have no Gordon value and are NaN.
+    """
+    # "Scenario Growth": Flow_t(new) = Flow_t(base) * (1 + G - base_growth)^t
+    W = np.asarray(wacc_axis, dtype=float)[:, None]
+    growth_delta = np.asarray(growth_axis, dtype=float)[None, :] - data.growth_rate_projection
+
+    base_fcfs = _resolve_base_fcfs(data)
+    if base_fcfs.size == 0:
+        shape = (W.shape[0], growth_delta.shape[1])
+        if terminal_growth_axis is not None:
+            shape += (len(terminal_growth_axis),)
+        return np.zeros(shape)
 
     years = len(base_fcfs)
     projected_years = np.arange(1, years + 1)
-    
-    # Loop for readability/broadcasting handling
-    # We apply G (which is e.g. -0.01 to +0.01) as ADDITIVE growth to the base stream?
-    # Or is G absolute growth?
-    # If base_growth is 0.0 (explicit flows), then G goes -0.01 to 0.01.
-    # Flow_t(new) = Flow_t(base) * (1 + G_delta)^t. 
-    # Yes, let's use G - base_growth as the delta.
-    
-    growth_delta = G - base_growth
-    
-    # EV Calculation inside matrix
-    # Sum PV(FCF)
-    for t_idx, t in enumerate(projected_years):
-        # We broadcast base_fcfs[t_idx] across the grid
-        flow_t = base_fcfs[t_idx] * ((1 + growth_delta) ** t)
-        discount_factor = (1 + W) ** t
-        ev_matrix += flow_t / discount_factor
-        
-    # Terminal Value
-    # TV uses the LAST flow.
-    # FCF_final_scenario = Base_Final * (1+delta)**5
-    last_flow_scenario = base_fcfs[-1] * ((1 + growth_delta) ** years)
-    
-    g_term = data.terminal_growth_rate
-    tv_num = last_flow_scenario * (1 + g_term)
-    tv_den = (W - g_term)
-    
-    pv_tv = (tv_num / tv_den) / ((1 + W) ** years)
-    
-    ev_matrix += pv_tv
-    
-    return ev_matrix
+
+    # Flow_t / (1+W)^t = Base_t * ((1+delta)/(1+W))^t -> contract over t with a matmul
+    ratio = (1 + growth_delta) / (1 + W)
+    pv_fcfs = np.power(ratio[..., None], projected_years) @ base_fcfs
+
+    # Terminal Value on the scenario's last flow, discounted at the scenario WACC
+    pv_last_flow = base_fcfs[-1] * ratio ** years
+
+    if terminal_growth_axis is None:
+        g_term = np.asarray(data.terminal_growth_rate, dtype=float)
+    else:
+        g_term = np.asarray(terminal_growth_axis, dtype=float)
+        W = W[..., None]
+        pv_fcfs = pv_fcfs[..., None]
+        pv_last_flow = pv_last_flow[..., None]
+
+    tv_den = W - g_term
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pv_tv = np.where(tv_den > 0, pv_last_flow * (1 + g_term) / tv_den, np.nan)
+
+    return pv_fcfs + pv_tv
+
+def run_sensitivity_analysis(data: FinancialInput) -> np.ndarray:
+    """
+    Varies WACC (+/- 2%) and Growth Rate (+/- 1%) on a 5x5 grid.
+    """
+    if not data.cash_flows and not data.revenue_historical:
+        return np.zeros((5, 5))
+
+    wacc_axis, growth_axis = build_sensitivity_axes(data)
+    return run_sensitivity_surface(data, wacc_axis, growth_axis)
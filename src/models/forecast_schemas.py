@@ -1,4 +1,4 @@
-from typing import List, Literal, Optional
+from typing import Dict, List, Literal, Optional
 from pydantic import BaseModel, Field, field_validator
 import numpy as np
 
@@ -6,15 +6,30 @@ class ForecastInput(BaseModel):
     dates: List[str] = Field(..., description="ISO format 'YYYY-MM-DD'")
     values: List[float] = Field(..., description="Historical data points (Must not contain NaNs)")
     periods: int = Field(default=12, gt=0, description="Number of months to forecast")
-    seasonality_mode: Literal["additive", "multiplicative"] = Field(..., description="Seasonality mode")
+    seasonality_mode: Literal["additive", "multiplicative", "auto"] = Field(..., description="Seasonality mode; 'auto' runs a model selection tournament (engine and warm_start then do not apply)")
+    selection_metric: Literal["aic", "holdout"] = Field(default="aic", description="Ranking used by 'auto': AIC or rolling-origin holdout MAE")
+    warm_start: bool = Field(default=False, description="Reuse a cached fit of this series without its latest months, refitting only on error drift")
+    interval_method: Literal["simulated", "constant"] = Field(default="constant", description="'simulated': quantiles of bootstrapped future paths; 'constant': forecast +/- 1.96 * residual std")
+    quantiles: List[float] = Field(default=[0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95], description="Quantile levels returned for simulated intervals (fan chart)")
+    simulation_paths: int = Field(default=2000, gt=0, description="Number of simulated paths")
+    simulation_seed: int = Field(default=42, description="Seed of the path simulation")
+    decomposition: Literal["model", "classical"] = Field(default="classical", description="'classical': seasonal_decompose trend/seasonal; 'model': smoothed level and season (factors if multiplicative) from the fitted model's states")
+    engine: Literal["statsmodels", "numpy"] = Field(default="statsmodels", description="Holt-Winters implementation; 'numpy' is a fast grid-search kernel for short series (needs >= 24 months)")
 
     @field_validator('values')
     @classmethod
     def check_nans(cls, v):
-        if any(np.isnan(x) for x in v):
+        if np.isnan(np.asarray(v, dtype=float)).any():
             raise ValueError("Values must not contain NaNs")
         return v
     
+    @field_validator('quantiles')
+    @classmethod
+    def check_quantiles(cls, v):
+        if any(not 0 < q < 1 for q in v):
+            raise ValueError("Quantile levels must be strictly between 0 and 1")
+        return v
+
     @field_validator('dates')
     @classmethod
     def check_dates_match_values(cls, v, info):
@@ -30,5 +45,16 @@ class ForecastOutput(BaseModel):
     forecast_values: List[float]
     lower_bound: List[float]
     upper_bound: List[float]
-    trend: List[float]
+    forecast_quantiles: Optional[Dict[str, List[float]]] = Field(default=None, description="Simulated forecast quantiles keyed by level, e.g. '0.05'")
+    trend: List[float] = Field(..., description="Trend component (smoothed level for decomposition='model')")
     seasonal: List[float]
+    slope: Optional[List[float]] = Field(default=None, description="Per-month trend slope state (model decomposition only)")
+    residuals: Optional[List[float]] = Field(default=None, description="One-step in-sample errors (history - fitted)")
+    model_name: Optional[str] = Field(default=None, description="Winning candidate when seasonality_mode='auto'")
+    model_scores: Optional[Dict[str, float]] = Field(default=None, description="Score per fitted candidate (lower is better)")
+    selection_metric: Optional[str] = Field(default=None, description="Metric the scores use ('aic' or 'holdout')")
+
+class BatchForecastResult(BaseModel):
+    index: int = Field(..., description="Position of the series in the submitted batch")
+    output: Optional[ForecastOutput] = None
+    error: Optional[str] = Field(default=None, description="Failure message if this series could not be forecast")
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Literal
 from pydantic import BaseModel, Field, field_validator
 
 class ProjectInput(BaseModel):
@@ -14,3 +14,13 @@ class ProjectInput(BaseModel):
         if not v:
             raise ValueError("Cash flows cannot be empty.")
         return v
+
+class HistogramBins(BaseModel):
+    """
+    Server-side binned distribution: a few hundred numbers instead of every sample.
+    counts[i] is the number of samples in [edges[i], edges[i+1]).
+    """
+    method: Literal["fixed", "fd", "quantile"]
+    edges: List[float]
+    counts: List[int]
+    total: int
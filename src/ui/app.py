@@ -7,6 +7,7 @@ from dotenv import load_dotenv
 from src.ui import home_layout
 from src.ui.valuation_layout import create_layout as create_valuation_layout
 from src.ui.budget_layout import create_budget_layout
+from src.ui.capital_layout import create_capital_layout
 from src.ui.navbar import create_navbar
 
 # Import callbacks (CRITICAL for funcationality)
@@ -15,6 +16,7 @@ from src.ui.budget_callbacks import register_budget_callbacks
 from src.ui.forecast_callbacks import register_forecast_callbacks
 from src.ui.liquidity_callbacks import register_liquidity_callbacks
 from src.ui.benchmark_callbacks import register_benchmark_callbacks
+from src.ui.capital_callbacks import register_capital_callbacks
 from src.core.database import init_db
 
 # Load env variables
@@ -48,6 +50,8 @@ def display_page(pathname):
         return create_valuation_layout()
     elif pathname == '/budget':
         return create_budget_layout()
+    elif pathname == '/capital':
+        return create_capital_layout()
     elif pathname == '/' or pathname == '/home':
         return home_layout.layout
     else:
@@ -59,6 +63,7 @@ register_budget_callbacks(app)
 register_forecast_callbacks(app)
 register_liquidity_callbacks(app)
 register_benchmark_callbacks(app)
+register_capital_callbacks(app)
 
 # 5. Run Server
 if __name__ == '__main__':
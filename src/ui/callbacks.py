@@ -1,12 +1,15 @@
 from dash import Input, Output, State, callback, no_update
 import plotly.graph_objects as go
-import numpy as np
 import dash_bootstrap_components as dbc
 from pydantic import ValidationError
 
-from src.core.valuation import calculate_dcf, run_sensitivity_analysis
+from src.core.valuation import calculate_dcf, build_sensitivity_axes, run_sensitivity_surface
 from src.models.schemas import FinancialInput
 
+# Heatmap resolution (points per axis). Cell labels are only drawn on small grids.
+SENSITIVITY_GRID_POINTS = 41
+SENSITIVITY_LABEL_MAX_POINTS = 7
+
 def register_callbacks(app):
     
     @app.callback(
@@ -63,7 +66,12 @@ def register_callbacks(app):
 
             # 2. Calculation
             results = calculate_dcf(fin_input)
-            sensitivity = run_sensitivity_analysis(fin_input)
+            wacc_axis, growth_axis = build_sensitivity_axes(
+                fin_input,
+                wacc_points=SENSITIVITY_GRID_POINTS,
+                growth_points=SENSITIVITY_GRID_POINTS
+            )
+            sensitivity = run_sensitivity_surface(fin_input, wacc_axis, growth_axis)
 
             # 3. Visualization
             ev_fmt = f"${results['enterprise_value']:,.2f}"
@@ -100,22 +108,14 @@ def register_callbacks(app):
             )
             
             # Heatmap
-            base_wacc = fin_input.wacc
-            base_growth = fin_input.growth_rate_projection
-            
-            wacc_axis = np.linspace(base_wacc - 0.02, base_wacc + 0.02, 5)
-            growth_axis = np.linspace(base_growth - 0.01, base_growth + 0.01, 5)
-            
-            x_labels = [f"G:{g:.1%}" for g in growth_axis]
-            y_labels = [f"W:{w:.1%}" for w in wacc_axis]
-            
             fig_heatmap = go.Figure(data=go.Heatmap(
                 z=sensitivity,
-                x=x_labels,
-                y=y_labels,
+                x=growth_axis,
+                y=wacc_axis,
                 colorscale='Viridis',
                 hoverongaps = False,
-                texttemplate="%{z:.0f}"
+                hovertemplate="G: %{x:.2%}<br>W: %{y:.2%}<br>EV: %{z:,.0f}<extra></extra>",
+                texttemplate="%{z:.0f}" if SENSITIVITY_GRID_POINTS <= SENSITIVITY_LABEL_MAX_POINTS else None
             ))
             
             fig_heatmap.update_layout(
@@ -127,8 +127,8 @@ def register_callbacks(app):
                 margin=dict(l=40, r=20, t=40, b=40),
                 plot_bgcolor="rgba(0,0,0,0)",
                 paper_bgcolor="rgba(0,0,0,0)",
-                xaxis=dict(showgrid=False, linecolor='#e2e8f0'),
-                yaxis=dict(showgrid=True, gridcolor='#f1f5f9', zeroline=False),
+                xaxis=dict(showgrid=False, linecolor='#e2e8f0', tickformat='.1%'),
+                yaxis=dict(showgrid=True, gridcolor='#f1f5f9', zeroline=False, tickformat='.1%'),
             )
             
             return ev_fmt, eq_fmt, share_price_fmt, fig_waterfall, fig_heatmap, False, "", ""
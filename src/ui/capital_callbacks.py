@@ -0,0 +1,190 @@
+from functools import lru_cache
+from dash import Input, Output, State, no_update
+import plotly.graph_objects as go
+import numpy as np
+from pydantic import ValidationError
+
+from src.core.capital_budgeting import CapitalBudgetingEngine
+from src.models.project_schemas import ProjectInput
+
+# Paths of the joint A/B simulation and number of bars sent to the browser
+SIMULATION_ITERATIONS = 5000
+HISTOGRAM_BINS = 40
+
+def parse_project(name, invest, flows_str, vol, wacc) -> ProjectInput:
+    """
+    Builds a validated ProjectInput from the raw sidebar values.
+    """
+    if not flows_str:
+        raise ValueError(f"{name}: cash flows cannot be empty")
+    try:
+        cash_flows = [float(x.strip()) for x in str(flows_str).split(',') if x.strip()]
+    except ValueError:
+        raise ValueError(f"{name}: cash flows must be a comma-separated list of numbers")
+
+    return ProjectInput(
+        name=name,
+        initial_investment=float(invest),
+        cash_flows=cash_flows,
+        volatility=float(vol),
+        discount_rate=float(wacc)
+    )
+
+def project_key(project: ProjectInput) -> tuple:
+    """
+    Normalized, hashable form of a ProjectInput used as the memoization key.
+    The name is left out: it does not change any number.
+    """
+    return (
+        round(project.initial_investment, 6),
+        tuple(round(cf, 6) for cf in project.cash_flows),
+        round(project.volatility, 6),
+        round(project.discount_rate, 6)
+    )
+
+def project_from_key(key: tuple) -> ProjectInput:
+    initial_investment, cash_flows, volatility, discount_rate = key
+    return ProjectInput(
+        name="cached",
+        initial_investment=initial_investment,
+        cash_flows=list(cash_flows),
+        volatility=volatility,
+        discount_rate=discount_rate
+    )
+
+@lru_cache(maxsize=128)
+def evaluate_project(key: tuple) -> dict:
+    """
+    Deterministic metrics of one project, memoized per key: they do not depend
+    on the project it is compared with.
+    The returned dict is shared between calls and must not be mutated.
+    """
+    initial_investment, cash_flows, _, _ = key
+    return {
+        "metrics": CapitalBudgetingEngine.calculate_metrics(project_from_key(key)),
+        "cumulative_flows": np.cumsum([-initial_investment] + list(cash_flows)).tolist()
+    }
+
+@lru_cache(maxsize=128)
+def simulate_pair(key_a: tuple, key_b: tuple) -> tuple:
+    """
+    Monte Carlo risk of the two compared projects from one joint draw
+    (run_joint_monte_carlo), memoized per pair of keys.
+    Only pre-binned histogram data is kept, never the raw distributions.
+    Returns one {"prob_loss", "prob_best", "histogram"} dict per project; shared, do not mutate.
+    """
+    joint = CapitalBudgetingEngine.run_joint_monte_carlo(
+        [project_from_key(key_a), project_from_key(key_b)],
+        iterations=SIMULATION_ITERATIONS
+    )
+    return tuple(
+        {
+            "prob_loss": project["prob_loss"],
+            "prob_best": prob_best,
+            "histogram": CapitalBudgetingEngine.bin_distribution(
+                project["distribution"], method="fd", bins=HISTOGRAM_BINS
+            )
+        }
+        for project, prob_best in zip(joint["projects"], joint["prob_best"])
+    )
+
+def format_metrics(result: dict) -> tuple:
+    metrics = result["metrics"]
+    irr_txt = f"IRR: {metrics['irr']:.1%}" if metrics["irr_converged"] else "IRR: n/a"
+    payback_txt = "Payback: Never" if np.isinf(metrics["payback"]) else f"Payback: {metrics['payback']:.1f} yrs"
+    return (
+        f"NPV: ${metrics['npv']:,.0f}",
+        irr_txt,
+        payback_txt,
+        f"Prob Loss: {result['prob_loss']:.1%}"
+    )
+
+def register_capital_callbacks(app):
+
+    @app.callback(
+        [
+            Output('out-a-npv', 'children'),
+            Output('out-a-irr', 'children'),
+            Output('out-a-payback', 'children'),
+            Output('out-a-risk', 'children'),
+            Output('out-b-npv', 'children'),
+            Output('out-b-irr', 'children'),
+            Output('out-b-payback', 'children'),
+            Output('out-b-risk', 'children'),
+            Output('chart-cumulative-flows', 'figure'),
+            Output('chart-risk-hist', 'figure')
+        ],
+        [Input('btn-compare', 'n_clicks')],
+        [
+            State('input-a-invest', 'value'),
+            State('input-a-flows', 'value'),
+            State('input-a-vol', 'value'),
+            State('input-b-invest', 'value'),
+            State('input-b-flows', 'value'),
+            State('input-b-vol', 'value'),
+            State('input-wacc-cap', 'value')
+        ],
+        # Runs on click only, so typing in the sidebar never triggers a simulation
+        prevent_initial_call=True
+    )
+    def compare_projects(n_clicks, a_invest, a_flows, a_vol, b_invest, b_flows, b_vol, wacc):
+        if not n_clicks:
+            return no_update
+
+        try:
+            project_a = parse_project("Project A", a_invest, a_flows, a_vol, wacc)
+            project_b = parse_project("Project B", b_invest, b_flows, b_vol, wacc)
+        except (ValueError, TypeError, ValidationError) as e:
+            error_msg = str(e)
+            if hasattr(e, 'errors'): # Pydantic
+                error_msg = "; ".join([err['msg'] for err in e.errors()])
+            return (f"Error: {error_msg}", "", "", "") * 2 + (no_update, no_update)
+
+        # Metrics are cached per project, the risk figures per compared pair
+        key_a, key_b = project_key(project_a), project_key(project_b)
+        risk_a, risk_b = simulate_pair(key_a, key_b)
+        result_a = {**evaluate_project(key_a), **risk_a}
+        result_b = {**evaluate_project(key_b), **risk_b}
+
+        # Cumulative Cash Flows (Year 0 = initial investment)
+        fig_flows = go.Figure()
+        for label, result, color in (("Project A", result_a, "#17a2b8"), ("Project B", result_b, "#ffc107")):
+            cumulative = result["cumulative_flows"]
+            fig_flows.add_trace(go.Scatter(
+                x=list(range(len(cumulative))),
+                y=cumulative,
+                name=label,
+                mode='lines+markers',
+                line=dict(color=color)
+            ))
+        fig_flows.add_hline(y=0, line_dash='dash', line_color='white')
+        fig_flows.update_layout(
+            title="Cumulative Cash Flows",
+            template="plotly_dark",
+            xaxis_title="Year",
+            yaxis_title="Cumulative ($)",
+            hovermode="x unified"
+        )
+
+        # Risk Histogram from pre-binned counts (bar per bin)
+        fig_hist = go.Figure()
+        for label, result, color in (("Project A", result_a, "#17a2b8"), ("Project B", result_b, "#ffc107")):
+            edges = np.array(result["histogram"].edges)
+            fig_hist.add_trace(go.Bar(
+                x=(edges[:-1] + edges[1:]) / 2,
+                y=result["histogram"].counts,
+                width=np.diff(edges),
+                name=label,
+                marker_color=color,
+                opacity=0.6
+            ))
+        fig_hist.add_vline(x=0, line_dash='dash', line_color='red')
+        fig_hist.update_layout(
+            title="NPV Distribution (Monte Carlo)",
+            template="plotly_dark",
+            barmode='overlay',
+            xaxis_title="NPV ($)",
+            yaxis_title="Paths"
+        )
+
+        return format_metrics(result_a) + format_metrics(result_b) + (fig_flows, fig_hist)
@@ -30,7 +30,9 @@ def register_forecast_callbacks(app):
             dates = pd.date_range(start='2022-01-01', periods=36, freq='MS')
             t = np.arange(36)
             # Linear trend + Annual Seasonality (sin wave) + Noise
-            values = 10000 + (200 * t) + (2000 * np.sin(2 * np.pi * t / 12)) + np.random.normal(0, 200, 36)
+            # Fixed seed: the same demo series on every callback lets the fitted-model cache hit
+            noise = np.random.default_rng(42).normal(0, 200, 36)
+            values = 10000 + (200 * t) + (2000 * np.sin(2 * np.pi * t / 12)) + noise
             dates_str = [d.strftime('%Y-%m-%d') for d in dates]
             values_list = values.tolist()
         else:
@@ -56,7 +58,11 @@ def register_forecast_callbacks(app):
                 dates=dates_str,
                 values=values_list,
                 periods=horizon,
-                seasonality_mode='additive'
+                seasonality_mode='additive',
+                # Fan chart bands from simulated paths (the default is the cheaper constant band)
+                interval_method='simulated',
+                # Trend/seasonal charts straight from the fitted states (no second decomposition pass)
+                decomposition='model'
             )
             forecast_out = ForecastEngine.generate_forecast(input_data)
         except Exception as e:
@@ -114,7 +120,28 @@ def register_forecast_callbacks(app):
             fillcolor='rgba(255, 165, 0, 0.2)', # Light Orange
             showlegend=True
         ))
-        
+
+        # Traces 5-6: Inner 50% band from the simulated quantiles
+        quantiles = forecast_out.forecast_quantiles or {}
+        if '0.25' in quantiles and '0.75' in quantiles:
+            fig.add_trace(go.Scatter(
+                x=forecast_out.forecast_dates,
+                y=np.array(quantiles['0.75']) * multiplier,
+                name='75th Percentile',
+                mode='lines',
+                line=dict(width=0),
+                showlegend=False
+            ))
+            fig.add_trace(go.Scatter(
+                x=forecast_out.forecast_dates,
+                y=np.array(quantiles['0.25']) * multiplier,
+                name='50% Interval',
+                mode='lines',
+                line=dict(width=0),
+                fill='tonexty',
+                fillcolor='rgba(255, 165, 0, 0.4)'
+            ))
+
         fig.update_layout(
             title="Revenue Forecast with 95% Confidence Interval",
             template="plotly_dark",
@@ -132,11 +159,9 @@ def register_forecast_callbacks(app):
         seasonal_fig.add_trace(go.Scatter(x=forecast_out.history_dates, y=forecast_out.seasonal, line=dict(color='cyan')))
         seasonal_fig.update_layout(title="Seasonal Pattern", template="plotly_dark", margin=dict(l=20, r=20, t=40, b=20))
         
-        # Residuals (Calculate roughly: History - (Trend + Seasonal))
-        # Or use output if available. Our Schema has trend/seasonal.
-        # Residuals = Val - (Trend + Seasonal)
-        resid = np.array(forecast_out.history_values) - (np.array(forecast_out.trend) + np.array(forecast_out.seasonal))
-        
+        # Residuals: one-step errors of the fitted model, straight from the output
+        resid = forecast_out.residuals
+
         resid_fig = go.Figure()
         resid_fig.add_trace(go.Scatter(x=forecast_out.history_dates, y=resid, mode='markers', marker=dict(color='red', size=4)))
         resid_fig.add_hline(y=0, line_dash='dash', line_color='white')
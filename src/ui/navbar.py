@@ -14,6 +14,7 @@ def create_navbar():
             dbc.NavItem(dbc.NavLink("Home", href="/", active="exact")),
             dbc.NavItem(dbc.NavLink("Valuation", href="/valuation", active="exact")),
             dbc.NavItem(dbc.NavLink("Budgeting", href="/budget", active="exact")),
+            dbc.NavItem(dbc.NavLink("Capital Projects", href="/capital", active="exact")),
             dbc.NavItem(dbc.NavLink("Settings", href="#")), # Placeholder
         ]
     )
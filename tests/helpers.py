@@ -0,0 +1,16 @@
+import pandas as pd
+import numpy as np
+from src.models.forecast_schemas import ForecastInput
+
+def make_input(n_months=36, seed=0, **overrides):
+    rng = np.random.default_rng(seed)
+    t = np.arange(n_months)
+    values = 1000 + 10 * t + 100 * np.sin(2 * np.pi * t / 12) + rng.normal(0, 5, n_months)
+    params = dict(
+        dates=pd.date_range(start='2020-01-01', periods=n_months, freq='MS').strftime('%Y-%m-%d').tolist(),
+        values=values.tolist(),
+        periods=12,
+        seasonality_mode='additive'
+    )
+    params.update(overrides)
+    return ForecastInput(**params)
@@ -0,0 +1,66 @@
+import pytest
+import numpy as np
+import pandas as pd
+from src.core.backtesting import BacktestEngine
+from src.core.forecasting import ForecastEngine, FIT_CACHE
+from tests.helpers import make_input
+
+def test_backtest_summary_matches_manual_metrics():
+    """
+    Sliding-window detail rows reproduce a direct generate_forecast call, and the
+    summary metrics are the means of the per-month errors.
+    """
+    inputs = {"revenue": make_input(n_months=30, seed=1)}
+    detail = BacktestEngine.run_backtest(inputs, horizon=3, initial=24, window="sliding", max_workers=1, detail=True)
+
+    # Cutoffs 24..29; the last folds are truncated by the end of the series
+    assert len(detail) == 3 + 3 + 3 + 3 + 2 + 1
+    first = detail[detail["cutoff"] == detail["cutoff"].min()]
+    direct = ForecastEngine.generate_forecast(make_input(n_months=24, seed=1, periods=3))
+    np.testing.assert_allclose(first["forecast"], direct.forecast_values)
+
+    summary = BacktestEngine.run_backtest(inputs, horizon=3, initial=24, window="sliding", max_workers=1)
+    h1 = detail[detail["horizon"] == 1]
+    row = summary[summary["horizon"] == 1].iloc[0]
+    ape = (h1["actual"] - h1["forecast"]).abs() / h1["actual"].abs() * 100
+    assert row["n_cutoffs"] == 6
+    assert row["mape"] == pytest.approx(ape.mean())
+    assert list(summary.columns) == ["series", "horizon", "n_cutoffs", "mae", "mape", "smape", "mase"]
+
+def test_expanding_backtest_warm_starts_between_cutoffs(monkeypatch):
+    calls = []
+    original = ForecastEngine.fit_holt_winters
+    monkeypatch.setattr(ForecastEngine, "fit_holt_winters", staticmethod(lambda s, mode: calls.append(len(s)) or original(s, mode)))
+
+    FIT_CACHE.clear()
+    summary = BacktestEngine.run_backtest([make_input(n_months=36)], horizon=6, initial=24, step=2, max_workers=1)
+
+    # Six folds, but only the first (plus any drift-triggered refit) runs the optimizer
+    assert calls[0] == 24 and len(calls) < 6
+    assert summary["n_cutoffs"].tolist() == [6, 6, 5, 5, 4, 4]
+    assert (summary["mase"] > 0).all()
+
+def test_parallel_backtest_matches_inline():
+    inputs = [make_input(n_months=30, seed=seed) for seed in range(3)]
+    inline = BacktestEngine.run_backtest(inputs, horizon=2, initial=26, max_workers=1)
+    parallel = BacktestEngine.run_backtest(inputs, horizon=2, initial=26, max_workers=2)
+
+    pd.testing.assert_frame_equal(inline, parallel)
+    assert sorted(inline["series"].unique()) == [0, 1, 2]
+
+    with pytest.raises(ValueError):
+        BacktestEngine.run_backtest(inputs, window="tumbling")
+
+def test_backtest_does_not_depend_on_fit_cache():
+    """
+    Same inputs, same output: an earlier fit of one fold's history must not change the backtest.
+    """
+    inputs = [make_input(n_months=36, seed=4)]
+    FIT_CACHE.clear()
+    cold = BacktestEngine.run_backtest(inputs, horizon=3, initial=24, max_workers=1, detail=True)
+
+    FIT_CACHE.clear()
+    ForecastEngine.get_fitted_model(ForecastEngine.preprocess_data(inputs[0].dates[:27], inputs[0].values[:27]), 'additive')
+    primed = BacktestEngine.run_backtest(inputs, horizon=3, initial=24, max_workers=1, detail=True)
+
+    pd.testing.assert_frame_equal(cold, primed)
@@ -0,0 +1,274 @@
+import pytest
+import warnings
+import numpy as np
+from src.core.capital_budgeting import CapitalBudgetingEngine
+from src.core.streaming_stats import StreamingSummary
+from src.models.project_schemas import ProjectInput
+
+def make_project(**overrides):
+    params = dict(
+        name="Project A",
+        initial_investment=100000.0,
+        cash_flows=[30000.0, 40000.0, 50000.0, 60000.0],
+        volatility=0.15,
+        discount_rate=0.10
+    )
+    params.update(overrides)
+    return ProjectInput(**params)
+
+# --- Test Streaming Monte Carlo ---
+
+def test_streaming_summary_matches_exact_statistics():
+    """
+    Running mean/variance are exact; sketch quantiles are within one sketch bin.
+    """
+    rng = np.random.default_rng(0)
+    values = rng.normal(50.0, 10.0, size=200_000)
+
+    summary = StreamingSummary(-30.0, 130.0, sketch_bins=4096)
+    for chunk in np.array_split(values, 37):
+        summary.update(chunk)
+
+    bin_width = 160.0 / 4096
+    assert summary.count == values.size
+    assert summary.mean == pytest.approx(values.mean(), rel=1e-12)
+    assert summary.variance == pytest.approx(values.var(ddof=1), rel=1e-9)
+    assert summary.below_threshold == np.count_nonzero(values < 0.0)
+    for q in (0.05, 0.5, 0.95):
+        assert abs(summary.quantile(q) - np.quantile(values, q)) <= bin_width
+
+def test_streaming_monte_carlo_independent_of_chunk_size():
+    """
+    Chunking only changes memory use: the generator is consumed in the same order.
+    """
+    project = make_project(volatility=0.6)
+    small = CapitalBudgetingEngine.run_monte_carlo_streaming(project, iterations=50_000, chunk_size=1_000)
+    single = CapitalBudgetingEngine.run_monte_carlo_streaming(project, iterations=50_000, chunk_size=50_000)
+
+    assert small["mean"] == pytest.approx(single["mean"], rel=1e-12)
+    assert small["prob_loss"] == single["prob_loss"]
+    assert small["histogram"]["counts"] == single["histogram"]["counts"]
+    assert sum(small["histogram"]["counts"]) + small["histogram"]["underflow"] + small["histogram"]["overflow"] == 50_000
+
+    # Analytic NPV moments
+    mean, std = CapitalBudgetingEngine._npv_moments(project)
+    assert small["mean"] == pytest.approx(mean, rel=0.01)
+    assert small["std"] == pytest.approx(std, rel=0.02)
+
+# --- Test Parallel Monte Carlo ---
+
+def test_parallel_monte_carlo_is_reproducible():
+    """
+    Same (seed, workers) -> bit-identical summary; different seeds differ.
+    """
+    project = make_project(volatility=0.6)
+    first = CapitalBudgetingEngine.run_monte_carlo_parallel(project, iterations=40_001, workers=2, seed=7, chunk_size=5_000)
+    second = CapitalBudgetingEngine.run_monte_carlo_parallel(project, iterations=40_001, workers=2, seed=7, chunk_size=5_000)
+    other = CapitalBudgetingEngine.run_monte_carlo_parallel(project, iterations=40_001, workers=2, seed=8, chunk_size=5_000)
+
+    assert first == second
+    assert first["iterations"] == 40_001
+    assert first["mean"] != other["mean"]
+
+def test_streaming_and_parallel_monte_carlo_accept_negative_cash_flow_year():
+    """
+    A negative year gives a negative std from means * volatility: it must not crash.
+    """
+    project = make_project(cash_flows=[30000.0, -20000.0, 50000.0, 60000.0], volatility=0.3)
+    streaming = CapitalBudgetingEngine.run_monte_carlo_streaming(project, iterations=20_000, chunk_size=5_000)
+    parallel = CapitalBudgetingEngine.run_monte_carlo_parallel(project, iterations=20_000, workers=2, chunk_size=5_000)
+
+    mean, std = CapitalBudgetingEngine._npv_moments(project)
+    assert streaming["mean"] == pytest.approx(mean, rel=0.02)
+    assert streaming["std"] == pytest.approx(std, rel=0.05)
+    assert parallel["iterations"] == 20_000
+
+def test_monte_carlo_leaves_global_rng_untouched():
+    np.random.seed(123)
+    expected = np.random.random()
+
+    np.random.seed(123)
+    CapitalBudgetingEngine.run_monte_carlo(make_project(), iterations=100)
+    assert np.random.random() == expected
+
+# --- Test Vectorized IRR ---
+
+def test_irr_batch_matches_numpy_financial():
+    """
+    Conventional streams (outlay then inflows) have a single root, which must match npf.irr.
+    """
+    import numpy_financial as npf
+
+    rng = np.random.default_rng(3)
+    cash_flows = np.hstack([-rng.uniform(50, 150, (500, 1)), rng.uniform(5, 60, (500, 8))])
+
+    result = CapitalBudgetingEngine.calculate_irr_batch(cash_flows)
+    expected = np.array([npf.irr(row) for row in cash_flows])
+
+    assert result["converged"].all()
+    np.testing.assert_allclose(result["irr"], expected, atol=1e-8)
+
+def test_irr_batch_long_monthly_stream_does_not_overflow():
+    """
+    360 monthly periods overflow (1 + r) ** -t at the -99% grid point: no warning, same root.
+    """
+    import numpy_financial as npf
+
+    cash_flows = np.hstack([[-100000.0], np.full(360, 900.0)])[None, :]
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        result = CapitalBudgetingEngine.calculate_irr_batch(cash_flows)
+
+    assert result["converged"].all()
+    assert result["irr"][0] == pytest.approx(npf.irr(cash_flows[0]), abs=1e-10)
+
+def test_irr_batch_reports_failures_instead_of_zero():
+    cash_flows = np.array([
+        [-100.0, 60.0, 60.0],  # Converges (~13.1%)
+        [-100.0, -10.0, -10.0] # Never recovers: no sign change
+    ])
+    result = CapitalBudgetingEngine.calculate_irr_batch(cash_flows)
+
+    assert result["status"].tolist() == ["converged", "no_sign_change"]
+    assert result["irr"][0] == pytest.approx(0.130662, abs=1e-6)
+    assert np.isnan(result["irr"][1])
+
+    metrics = CapitalBudgetingEngine.calculate_metrics(make_project(cash_flows=[-10.0, -10.0]))
+    assert metrics["irr_converged"] is False and np.isnan(metrics["irr"])
+
+# --- Test Path Metrics ---
+
+def test_irr_batch_edge_cases():
+    cash_flows = np.array([
+        [0.0, 0.0, 0.0],       # No cash flows: every rate is a root
+        [-100.0, 230.0, -132.0], # Roots at 10% and 20% within one coarse grid cell
+        [-100.0, 1e6, 0.0]       # Very large root (999,900%)
+    ])
+    result = CapitalBudgetingEngine.calculate_irr_batch(cash_flows)
+
+    assert result["status"].tolist() == ["zero_cash_flows", "converged", "converged"]
+    assert not result["converged"][0] and np.isnan(result["irr"][0])
+    # Several roots: the lowest non-negative one
+    assert result["irr"][1] == pytest.approx(0.10, abs=1e-6)
+    assert result["irr"][2] == pytest.approx(9999.0, rel=1e-8)
+
+def test_path_metrics_collapse_to_deterministic_without_volatility():
+    """
+    With zero volatility every path equals the base case, so each percentile
+    equals the deterministic metric.
+    """
+    project = make_project(volatility=0.0)
+    deterministic = CapitalBudgetingEngine.calculate_metrics(project)
+    result = CapitalBudgetingEngine.run_monte_carlo(project, iterations=200, include_path_metrics=True)
+    metrics = result["path_metrics"]
+
+    assert metrics["irr"]["p50"] == pytest.approx(deterministic["irr"], abs=1e-9)
+    assert metrics["irr"]["converged_share"] == 1.0
+    assert metrics["payback"]["p5"] == pytest.approx(deterministic["payback"])
+    assert metrics["payback"]["prob_no_payback"] == 0.0
+    assert metrics["pi"]["p95"] == pytest.approx(deterministic["pi"])
+
+def test_payback_batch_handles_unrecovered_rows():
+    cash_flows = np.array([
+        [-100.0, 60.0, 60.0], # 1 + 40/60
+        [-100.0, 10.0, 10.0], # Never
+        [-100.0, 100.0, 0.0]  # Exactly in year 1
+    ])
+    payback = CapitalBudgetingEngine.calculate_payback_batch(cash_flows)
+    np.testing.assert_allclose(payback, [1 + 40 / 60, np.inf, 1.0])
+
+# --- Test Joint Simulation ---
+
+def test_joint_monte_carlo_correlation_and_ar1_variance():
+    """
+    Cross-project correlation shows up in the NPVs, and AR(1) shocks give
+    Var(NPV) = d' S d with S_ts = sd_t * sd_s * phi^|t - s|.
+    """
+    a = make_project(name="A", cash_flows=[50000.0])
+    b = make_project(name="B", cash_flows=[50000.0], volatility=0.3)
+    joint = CapitalBudgetingEngine.run_joint_monte_carlo([a, b], [[1.0, 0.7], [0.7, 1.0]], iterations=100_000)
+    assert joint["npv_correlation"][0][1] == pytest.approx(0.7, abs=0.01)
+    assert sum(joint["prob_best"]) == pytest.approx(1.0)
+
+    phi = 0.6
+    project = make_project(volatility=0.2)
+    result = CapitalBudgetingEngine.run_joint_monte_carlo([project], autocorrelation=phi, iterations=200_000)
+    npvs = np.array(result["projects"][0]["distribution"])
+
+    sd = np.array(project.cash_flows) * project.volatility
+    t = np.arange(1, len(sd) + 1)
+    d = 1 / (1 + project.discount_rate) ** t
+    cov = np.outer(sd, sd) * phi ** np.abs(t[:, None] - t[None, :])
+    assert npvs.var() == pytest.approx(d @ cov @ d, rel=0.02)
+
+def test_joint_monte_carlo_rejects_invalid_correlation():
+    projects = [make_project(name="A"), make_project(name="B")]
+    with pytest.raises(ValueError):
+        CapitalBudgetingEngine.run_joint_monte_carlo(projects, [[1.0, 1.5], [1.5, 1.0]])
+    with pytest.raises(ValueError):
+        CapitalBudgetingEngine.run_joint_monte_carlo(projects, [[1.0, 0.2, 0.0], [0.2, 1.0, 0.0], [0.0, 0.0, 1.0]])
+
+# --- Test Variance Reduction ---
+
+def test_variance_reduction_methods_agree_with_analytic_loss_probability():
+    """
+    NPV is normal here, so P(NPV < 0) is known. Every method must land within
+    4 reported standard errors of it, and reduce the error vs plain sampling.
+    """
+    from scipy.stats import norm
+
+    project = make_project(volatility=0.8)
+    mean, std = CapitalBudgetingEngine._npv_moments(project)
+    true_prob_loss = norm.cdf(-mean / std)
+
+    standard = CapitalBudgetingEngine.run_monte_carlo(project, iterations=4096, method="standard")
+    for method in ("antithetic", "control_variate", "sobol"):
+        result = CapitalBudgetingEngine.run_monte_carlo(project, iterations=4096, method=method)
+        assert result["iterations"] == 4096
+        assert abs(result["prob_loss"] - true_prob_loss) < 4 * result["std_error"]
+        assert result["std_error"] < standard["std_error"]
+
+    # Antithetic pairs cancel exactly for a linear statistic like mean NPV
+    antithetic = CapitalBudgetingEngine.run_monte_carlo(project, iterations=1001, method="antithetic")
+    assert len(antithetic["distribution"]) == 1001
+    assert antithetic["mean_std_error"] == pytest.approx(0.0, abs=1e-6)
+
+def test_unknown_monte_carlo_method_rejected():
+    with pytest.raises(ValueError):
+        CapitalBudgetingEngine.run_monte_carlo(make_project(), method="lattice")
+
+# --- Test Server-side Binning ---
+
+def test_binned_monte_carlo_result_is_compact():
+    result = CapitalBudgetingEngine.run_monte_carlo(
+        make_project(), iterations=20_000, histogram="fd", bins=40, include_distribution=False
+    )
+    hist = result["histogram"]
+
+    assert "distribution" not in result
+    assert hist.total == 20_000 and sum(hist.counts) == 20_000
+    assert len(hist.edges) == len(hist.counts) + 1 <= 41
+
+def test_quantile_bins_hold_equal_counts():
+    values = np.random.default_rng(0).lognormal(size=10_000)
+    hist = CapitalBudgetingEngine.bin_distribution(values, method="quantile", bins=10)
+
+    assert hist.counts == [1000] * 10
+    with pytest.raises(ValueError):
+        CapitalBudgetingEngine.bin_distribution(values, method="sturges")
+
+def test_streaming_histogram_display_range():
+    """
+    Display bins span about +/- 4 std while quantiles still use the +/- 8 std sketch.
+    """
+    project = make_project(volatility=0.6)
+    result = CapitalBudgetingEngine.run_monte_carlo_streaming(project, iterations=50_000, chunk_size=10_000)
+    hist = result["histogram"]
+    edges = np.array(hist["edges"])
+
+    assert len(hist["counts"]) == 50
+    assert edges[0] == pytest.approx(result["mean"] - 4 * result["std"], rel=0.01)
+    assert edges[-1] == pytest.approx(result["mean"] + 4 * result["std"], rel=0.01)
+    assert sum(hist["counts"]) + hist["underflow"] + hist["overflow"] == 50_000
+    # Almost every display bin is populated
+    assert np.count_nonzero(hist["counts"]) >= 45
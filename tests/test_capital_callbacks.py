@@ -0,0 +1,77 @@
+import pytest
+from src.core.capital_budgeting import CapitalBudgetingEngine
+from src.ui.capital_callbacks import (
+    SIMULATION_ITERATIONS, evaluate_project, parse_project, project_key, register_capital_callbacks, simulate_pair
+)
+
+class CallbackRecorder:
+    """
+    Stand-in for the Dash app: keeps the decorated callback functions.
+    """
+    def __init__(self):
+        self.callbacks = []
+
+    def callback(self, *args, **kwargs):
+        def register(func):
+            self.callbacks.append(func)
+            return func
+        return register
+
+def test_project_key_ignores_name():
+    a = parse_project("Project A", 100000, "30000, 40000,50000", 0.15, 0.10)
+    b = parse_project("Project B", "100000", "30000,40000,50000", "0.15", "0.1")
+    assert project_key(a) == project_key(b)
+    assert project_key(a) != project_key(parse_project("Project A", 100000, "30000,40000,50001", 0.15, 0.10))
+
+def test_identical_projects_hit_the_cache():
+    evaluate_project.cache_clear()
+    key = project_key(parse_project("Project A", 100000, "30000,40000,50000", 0.15, 0.10))
+
+    first = evaluate_project(key)
+    second = evaluate_project(project_key(parse_project("Project B", 100000, "30000,40000,50000", 0.15, 0.10)))
+
+    assert second is first
+    info = evaluate_project.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+
+def test_pair_is_simulated_jointly():
+    simulate_pair.cache_clear()
+    project_a = parse_project("Project A", 100000, "30000,40000,50000", 0.15, 0.10)
+    project_b = parse_project("Project B", 80000, "20000,30000,45000", 0.30, 0.10)
+    key_a, key_b = project_key(project_a), project_key(project_b)
+
+    risk_a, risk_b = simulate_pair(key_a, key_b)
+    assert simulate_pair(key_a, key_b)[0] is risk_a
+    info = simulate_pair.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+
+    joint = CapitalBudgetingEngine.run_joint_monte_carlo([project_a, project_b], iterations=SIMULATION_ITERATIONS)
+    assert [risk_a["prob_loss"], risk_b["prob_loss"]] == [p["prob_loss"] for p in joint["projects"]]
+    assert risk_a["prob_best"] + risk_b["prob_best"] == pytest.approx(1.0)
+    assert risk_a["histogram"].total == SIMULATION_ITERATIONS
+
+def test_compare_projects_outputs():
+    app = CallbackRecorder()
+    register_capital_callbacks(app)
+    compare_projects = app.callbacks[0]
+
+    outputs = compare_projects(1, 100000, "30000,40000,50000", 0.15, 80000, "20000,30000,45000", 0.30, 0.10)
+
+    assert outputs[0].startswith("NPV: $") and outputs[3].startswith("Prob Loss: ")
+    assert outputs[4].startswith("NPV: $") and outputs[7].startswith("Prob Loss: ")
+    assert len(outputs[8].data) == 2 and len(outputs[9].data) == 2
+
+@pytest.mark.parametrize("flows, vol, message", [
+    ("", 0.15, "Project A: cash flows cannot be empty"),
+    ("30000, abc", 0.15, "Project A: cash flows must be a comma-separated list of numbers"),
+    ("30000,40000", 1.5, "less than or equal to 1"),
+])
+def test_validation_errors_become_messages(flows, vol, message):
+    app = CallbackRecorder()
+    register_capital_callbacks(app)
+    compare_projects = app.callbacks[0]
+
+    outputs = compare_projects(1, 100000, flows, vol, 100000, "30000,40000", 0.15, 0.10)
+
+    assert outputs[0].startswith("Error: ") and message in outputs[0]
+    assert outputs[1:4] == ("", "", "")
@@ -1,7 +1,10 @@
 import pytest
 from pydantic import ValidationError
 import numpy as np
-from src.core.valuation import calculate_dcf, run_sensitivity_analysis
+from src.core.valuation import (
+    calculate_dcf, calculate_dcf_batch, run_sensitivity_analysis,
+    build_sensitivity_axes, run_sensitivity_surface
+)
 from src.models.schemas import FinancialInput
 
 # --- Test Validation ---
@@ -94,3 +97,50 @@ def test_sensitivity_matrix_properties():
     # Higher Growth should yield HIGHER value
     # matrix[0,0] (Low Growth) vs matrix[0,4] (High Growth)
     assert matrix[0, 4] > matrix[0, 0], "Higher Growth should result in higher Enterprise Value"
+
+def test_sensitivity_surface_high_resolution():
+    """
+    Arbitrary grids: the centre of an odd-sized grid is the base-case DCF,
+    and a third (terminal growth) axis adds a dimension.
+    """
+    data = FinancialInput(
+        cash_flows=[100.0, 120.0, 140.0, 160.0, 180.0],
+        wacc=0.10,
+        terminal_growth_rate=0.03
+    )
+    wacc_axis, growth_axis = build_sensitivity_axes(data, wacc_points=201, growth_points=101)
+    surface = run_sensitivity_surface(data, wacc_axis, growth_axis)
+
+    assert surface.shape == (201, 101)
+    assert surface[100, 50] == pytest.approx(calculate_dcf(data)["enterprise_value"], rel=1e-12)
+
+    cube = run_sensitivity_surface(data, wacc_axis, growth_axis, terminal_growth_axis=[0.01, 0.02, 0.03])
+    assert cube.shape == (201, 101, 3)
+    np.testing.assert_allclose(cube[..., 2], surface)
+
+    # WACC at or below terminal growth has no Gordon value
+    low = run_sensitivity_surface(data, [0.02, 0.10], [0.0])
+    assert np.isnan(low[0, 0]) and np.isfinite(low[1, 0])
+
+# --- Test Batch Valuation ---
+
+def test_dcf_batch_matches_scalar():
+    """
+    Ragged streams with per-row WACC / terminal growth must match calculate_dcf row by row.
+    """
+    rng = np.random.default_rng(7)
+    streams = [rng.uniform(-50, 200, size=n).tolist() for n in (2, 5, 9, 17, 3)]
+    waccs = [0.08, 0.10, 0.12, 0.09, 0.15]
+    growths = [0.02, 0.0, 0.03, -0.01, 0.025]
+
+    batch = calculate_dcf_batch(streams, waccs, growths)
+
+    for i, flows in enumerate(streams):
+        single = calculate_dcf(FinancialInput(wacc=waccs[i], terminal_growth_rate=growths[i], cash_flows=flows))
+        assert batch["npv"][i] == pytest.approx(single["npv"], rel=1e-12)
+        assert batch["pv_terminal_value"][i] == pytest.approx(single["pv_terminal_value"], rel=1e-12)
+        assert batch["enterprise_value"][i] == pytest.approx(single["enterprise_value"], rel=1e-12)
+
+def test_dcf_batch_rejects_growth_above_wacc():
+    with pytest.raises(ValueError):
+        calculate_dcf_batch([[100.0, 110.0]], 0.05, 0.06)
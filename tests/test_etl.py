@@ -1,7 +1,7 @@
 import pytest
 import pandas as pd
 import numpy as np
-from src.core.etl_engine import SmartImporter
+from src.core.etl_engine import SmartImporter, ColumnIndex
 
 def test_messy_headers():
     """
@@ -59,3 +59,191 @@ def test_garbage_check():
     # Check report
     match = report.get('Employee Birthday', '')
     assert "Unmapped" in match, "Should be flagged as Low Confidence/Unmapped"
+
+# --- Test Streaming Import ---
+
+def make_ledger(n_rows=2500):
+    months = pd.date_range('2020-01-01', periods=n_rows, freq='D').strftime('%Y-%m-%d')
+    amounts = np.arange(n_rows) * 10.0
+    return pd.DataFrame({
+        'Mnth': months,
+        'TtL Sales': [f"${a:,.2f}" if i % 3 else f"({a:,.2f})" for i, a in enumerate(amounts)],
+        'Memo': ['note'] * n_rows
+    })
+
+def test_stream_import_matches_in_memory_cleaning(tmp_path):
+    """
+    Chunked CSV import = mapping + cleaning the whole file at once.
+    """
+    path = tmp_path / "ledger.csv"
+    make_ledger().to_csv(path, index=False)
+
+    chunks = []
+    summary = SmartImporter.stream_import(path, chunks.append, chunk_size=1000)
+    assert (summary["rows"], summary["chunks"]) == (2500, 3)
+    assert summary["mapping"]["TtL Sales"] == 'revenue'
+    assert max(len(c) for c in chunks) == 1000
+
+    mapped, _ = SmartImporter.fuzzy_map_columns(pd.read_csv(path, dtype={'TtL Sales': str}))
+    expected = SmartImporter.clean_financial_values(mapped)
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), expected)
+
+def test_iter_import_streams_excel(tmp_path):
+    path = tmp_path / "ledger.xlsx"
+    make_ledger(250).to_excel(path, index=False)
+
+    chunked = SmartImporter.iter_import(path, chunk_size=100)
+    assert chunked.rename == {'Mnth': 'date', 'TtL Sales': 'revenue'}
+    chunks = list(chunked)
+
+    assert [len(c) for c in chunks] == [100, 100, 50]
+    combined = pd.concat(chunks, ignore_index=True)
+    assert combined['revenue'].iloc[:3].tolist() == [-0.0, 10.0, 20.0]
+    assert combined['date'].notna().all()
+
+    with pytest.raises(ValueError):
+        SmartImporter.iter_import(tmp_path / "ledger.parquet")
+
+# --- Test Vectorized Accounting Parser ---
+
+def legacy_parse_accounting(series: pd.Series) -> pd.Series:
+    """
+    The original per-cell parser, kept as the reference for the vectorized one.
+    """
+    series = series.astype(str).str.strip()
+    series = series.str.replace(r'[$,€]', '', regex=True)
+
+    def parse_accounting(val):
+        if pd.isna(val) or val == 'nan':
+            return np.nan
+        val = val.strip()
+        if val == '-':
+            return 0.0
+        if val.startswith('(') and val.endswith(')'):
+            return -1.0 * float(val[1:-1])
+        try:
+            return float(val)
+        except ValueError:
+            return np.nan
+
+    return series.apply(parse_accounting)
+
+def test_vectorized_parser_matches_legacy_parser():
+    rng = np.random.default_rng(0)
+    amounts = rng.uniform(-1e6, 1e6, 5000).round(2)
+    cells = []
+    for i, a in enumerate(amounts):
+        style = i % 6
+        if style == 0:
+            cells.append(f"${abs(a):,.2f}" if a >= 0 else f"(${abs(a):,.2f})")
+        elif style == 1:
+            cells.append(f"  €{a:.2f} ")
+        elif style == 2:
+            cells.append(str(a))
+        elif style == 3:
+            cells.append(rng.choice(["-", " - ", "nan", "", "Garbage", "1e3", "+5", ".5"]))
+        elif style == 4:
+            cells.append(f"({abs(a):,.0f})")
+        else:
+            cells.append(None)
+    series = pd.Series(cells, dtype=object)
+
+    result = SmartImporter.parse_accounting_values(series, decimal='.')
+    pd.testing.assert_series_equal(result, legacy_parse_accounting(series), check_names=False)
+
+@pytest.mark.parametrize("cell", [
+    "-910-",    # Two minus signs
+    "33e 3",    # Whitespace inside the exponent
+    "69.e+75$", # Must round like float()
+    "(-5)", "( 5 )", "$-", "5.", "+5", "1e3", "inf", "-nan", "- 5", "12 34", "None", ""
+])
+def test_parser_edge_cases_match_legacy_parser(cell):
+    series = pd.Series([cell], dtype=object)
+    result = SmartImporter.parse_accounting_values(series, decimal='.')
+    pd.testing.assert_series_equal(result, legacy_parse_accounting(series), check_names=False)
+
+def test_european_parser_rejects_spaced_exponent():
+    result = SmartImporter.parse_accounting_values(pd.Series(["33e 3", "1 234,5"]), decimal=',')
+    assert np.isnan(result[0]) and result[1] == 1234.5
+
+def test_parser_handles_trailing_minus_and_european_decimals():
+    us = pd.Series(["1,234.50", "100-", "(2,000)", "-", "£12"])
+    assert SmartImporter.parse_accounting_values(us).tolist() == [1234.5, -100.0, -2000.0, 0.0, 12.0]
+
+    european = pd.Series(["1.234,56", "(1.000,00)", "12,5", "€ 3.000.000,10", "99-", "1 234,00"])
+    assert SmartImporter.detect_decimal_separator(european) == ','
+    np.testing.assert_allclose(
+        SmartImporter.parse_accounting_values(european),
+        [1234.56, -1000.0, 12.5, 3000000.10, -99.0, 1234.0]
+    )
+
+    # "1,234" alone is ambiguous: read as US thousands, as before
+    assert SmartImporter.parse_accounting_values(pd.Series(["1,234", "5"])).tolist() == [1234.0, 5.0]
+    # Already numeric columns pass straight through
+    assert SmartImporter.parse_accounting_values(pd.Series([1, 2])).tolist() == [1.0, 2.0]
+
+# --- Test Column Mapping Index ---
+
+def test_column_index_normalized_and_locale_hits():
+    index = SmartImporter.column_index()
+    assert SmartImporter.column_index() is index, "Index should be built once"
+
+    mapped, report = SmartImporter.map_columns(['NET-INCOME', 'Umsatzerlöse', 'Résultat Net', 'Fecha', 'Employee Birthday'])
+    assert mapped == {'NET-INCOME': 'net_income', 'Umsatzerlöse': 'revenue', 'Résultat Net': 'net_income', 'Fecha': 'date'}
+    assert "Unmapped" in report['Employee Birthday']
+
+def test_confirmed_mapping_skips_scoring(tmp_path, monkeypatch):
+    monkeypatch.setattr(SmartImporter, 'MAPPING_MEMORY_PATH', str(tmp_path / "mappings.json"))
+    columns = ['Posting Per.', 'Amt LC', 'Memo']
+    SmartImporter.confirm_mapping('sap', {'Posting Per.': 'date', 'Amt LC': 'revenue'}, columns)
+
+    def no_scoring(self, columns):
+        raise AssertionError("Remembered headers should not be scored")
+    monkeypatch.setattr(ColumnIndex, 'match', no_scoring)
+
+    mapped, report = SmartImporter.map_columns(columns, source_system='sap')
+    assert mapped == {'Posting Per.': 'date', 'Amt LC': 'revenue'}
+    assert report['Memo'] == "Unmapped (Confirmed)"
+
+# --- Test Batch Ingestion ---
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_ingest_files_merges_and_reports_quality(tmp_path, max_workers):
+    make_ledger(120).to_csv(tmp_path / "entity_a.csv", index=False)
+    pd.DataFrame({
+        'Period': ['2024-01-31', 'not a date', '2024-03-31'],
+        'Sales': ['1.000,50', '2.000,00', 'TBD'],
+        'Cost of Sales': ['100', '200', '300']
+    }).to_csv(tmp_path / "entity_b.csv", index=False)
+    sources = [tmp_path / "entity_a.csv", tmp_path / "entity_b.csv", tmp_path / "missing.csv"]
+
+    merged, report = SmartImporter.ingest_files(sources, max_workers=max_workers)
+
+    assert list(merged.columns) == ['date', 'revenue', 'cogs', 'source_file']
+    assert len(merged) == 123
+    assert merged.loc[merged['source_file'] == 'entity_a.csv', 'cogs'].isna().all()
+    assert merged.loc[merged['source_file'] == 'entity_b.csv', 'revenue'].iloc[0] == 1000.5
+
+    report = report.set_index('source_file')
+    assert report.loc['entity_a.csv', 'unmapped_columns'] == ['Memo']
+    assert report.loc['entity_b.csv', 'rows'] == 3
+    assert report.loc['entity_b.csv', 'coerced_nans'] == {'revenue': 1, 'cogs': 0}
+    assert report.loc['entity_b.csv', 'unparseable_dates'] == 1
+    assert report.loc['missing.csv', 'error'] is not None
+
+def test_stream_import_fixes_date_format_across_chunks(tmp_path):
+    """
+    Day/month order is decided once: "01/03/2023" means the same date in every chunk.
+    """
+    path = tmp_path / "ledger.csv"
+    path.write_text("Date,Revenue\n01/02/2023,1\n01/03/2023,2\n13/02/2023,3\n01/03/2023,4\n")
+
+    chunks = []
+    summary = SmartImporter.stream_import(path, chunks.append, chunk_size=2)
+    dates = pd.concat(chunks, ignore_index=True)['date']
+
+    assert summary["chunks"] == 2
+    assert dates[1] == dates[3] == pd.Timestamp('2023-01-03')
+    assert pd.isna(dates[2])
+    expected = SmartImporter.clean_financial_values(pd.read_csv(path).rename(columns={'Date': 'date', 'Revenue': 'revenue'}))
+    pd.testing.assert_series_equal(dates, expected['date'])
@@ -1,8 +1,9 @@
 import pytest
 import pandas as pd
 import numpy as np
-from src.core.forecasting import ForecastEngine
+from src.core.forecasting import ForecastEngine, FittedModelCache, FIT_CACHE, FORECAST_CANDIDATES, _state_components
 from src.models.forecast_schemas import ForecastInput
+from tests.helpers import make_input
 
 def test_flat_line():
     """
@@ -75,3 +76,267 @@ def test_perfect_sine_wave():
     # Peak should be around 150, Trough around 50.
     assert np.max(forecast_values) > 130
     assert np.min(forecast_values) < 70
+
+def test_batch_forecast_isolates_failures():
+    """
+    A series too short for a seasonal fit must fail alone; the rest of the batch completes.
+    """
+    inputs = [make_input(seed=0), make_input(n_months=3), make_input(seed=2)]
+
+    for max_workers in (1, 2):
+        results = sorted(ForecastEngine.generate_forecast_batch(inputs, max_workers=max_workers, chunk_size=1), key=lambda r: r.index)
+
+        assert [r.index for r in results] == [0, 1, 2]
+        assert results[1].output is None and results[1].error
+        single = ForecastEngine.generate_forecast(inputs[0])
+        assert results[0].output.forecast_values == pytest.approx(single.forecast_values)
+        assert len(results[2].output.forecast_values) == 12
+
+def test_horizon_change_reuses_cached_fit():
+    """
+    Only the horizon changes: the second call must be a cache hit with identical leading forecasts.
+    """
+    FIT_CACHE.clear()
+    short = ForecastEngine.generate_forecast(make_input(periods=6))
+    long = ForecastEngine.generate_forecast(make_input(periods=18))
+
+    assert (FIT_CACHE.hits, FIT_CACHE.misses) == (1, 1)
+    assert long.forecast_values[:6] == pytest.approx(short.forecast_values)
+
+    # Different seasonality mode is a different model
+    ForecastEngine.generate_forecast(make_input(seasonality_mode='multiplicative'))
+    assert FIT_CACHE.misses == 2
+
+def test_fit_cache_lru_eviction_and_memory_cap():
+    series = ForecastEngine.preprocess_data(make_input().dates, make_input().values)
+    fit = ForecastEngine.fit_holt_winters(series, 'additive')
+
+    cache = FittedModelCache(max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.put(key, fit)
+    assert cache.get("a") is None and cache.get("c") is fit
+    assert len(cache) == 2
+
+    tiny = FittedModelCache(max_bytes=100)
+    tiny.put("a", fit)
+    assert len(tiny) == 0 and tiny.size_bytes == 0
+
+def test_warm_start_extends_previous_fit_without_reoptimizing():
+    """
+    Appending months keeps the old smoothing parameters and states unless the errors drift.
+    """
+    history = make_input(n_months=38)
+    series = ForecastEngine.preprocess_data(history.dates, history.values)
+    previous = ForecastEngine.fit_holt_winters(series.iloc[:36], 'additive')
+
+    warm, refitted = ForecastEngine.update_fitted_model(previous, series, 'additive')
+    assert not refitted
+    assert warm.params['smoothing_level'] == previous.params['smoothing_level']
+    np.testing.assert_allclose(warm.level[:36], previous.level)
+
+    # A structural break in the new months triggers a full re-optimization
+    shocked = series.copy()
+    shocked.iloc[-2:] += 500
+    _, refitted = ForecastEngine.update_fitted_model(previous, shocked, 'additive')
+    assert refitted
+
+def test_warm_start_uses_cached_prefix_fit():
+    FIT_CACHE.clear()
+    ForecastEngine.generate_forecast(make_input(n_months=36))
+    warm = ForecastEngine.generate_forecast(make_input(n_months=37, warm_start=True))
+
+    # Only the exact-key lookup for the 37-month series misses; the prefix probe is silent
+    assert (FIT_CACHE.hits, FIT_CACHE.misses) == (0, 2)
+    assert len(warm.forecast_values) == 12
+
+# --- Test NumPy Holt-Winters Kernel ---
+
+@pytest.mark.parametrize("seasonal", ["add", "mul"])
+def test_numpy_kernel_matches_statsmodels_recursion(seasonal):
+    """
+    With the same parameters and initial states, the NumPy recursion must reproduce
+    statsmodels' fitted values, states and forecasts.
+    """
+    from statsmodels.tsa.holtwinters import ExponentialSmoothing
+    from src.core.forecasting import holt_winters_recursion, forecast_holt_winters_numpy
+
+    series = ForecastEngine.preprocess_data(make_input().dates, make_input().values)
+    l0, b0, s0 = 1000.0, 8.0, 100 * np.sin(2 * np.pi * np.arange(12) / 12)
+    if seasonal == 'mul':
+        s0 = 1 + s0 / 1000
+    alpha, beta, gamma = 0.3, 0.05, 0.2
+
+    reference = ExponentialSmoothing(
+        series, seasonal_periods=12, trend='add', seasonal=seasonal,
+        initialization_method='known', initial_level=l0, initial_trend=b0, initial_seasonal=s0
+    ).fit(smoothing_level=alpha, smoothing_trend=beta, smoothing_seasonal=gamma, optimized=False)
+
+    fitted, level, trend, season = holt_winters_recursion(series.to_numpy(), alpha, beta, gamma, l0, b0, s0, seasonal)
+    np.testing.assert_allclose(fitted, reference.fittedvalues, rtol=1e-10)
+    np.testing.assert_allclose(level, reference.level, rtol=1e-10)
+    np.testing.assert_allclose(trend, reference.trend, rtol=1e-10)
+
+    # statsmodels reuses the previous cycle's season at h = 12, 24, ...; the kernel uses the
+    # latest update there (textbook s_{t+h-m(k+1)}), so only the other horizons are compared
+    state = {"s0": s0[None], "level": level[None], "trend": trend[None], "season": season[None]}
+    horizons = np.arange(1, 16) % 12 != 0
+    np.testing.assert_allclose(
+        forecast_holt_winters_numpy(state, 15, seasonal)[0][horizons], reference.forecast(15)[horizons], rtol=1e-10
+    )
+
+def test_numpy_kernel_batch_equals_single_fits():
+    from src.core.forecasting import fit_holt_winters_numpy
+
+    values = np.vstack([make_input(seed=seed).values for seed in range(4)])
+    batch = fit_holt_winters_numpy(values)
+    for row in range(4):
+        single = fit_holt_winters_numpy(values[row])
+        assert batch["alpha"][row] == single["alpha"][0]
+        np.testing.assert_allclose(batch["fitted"][row], single["fitted"][0])
+
+    with pytest.raises(ValueError):
+        fit_holt_winters_numpy(values[:, :20])
+
+def test_numpy_engine_forecast_close_to_statsmodels():
+    """
+    The grid search lands near statsmodels' optimum on a clean seasonal series.
+    """
+    statsmodels_out = ForecastEngine.generate_forecast(make_input())
+    numpy_out = ForecastEngine.generate_forecast(make_input(engine='numpy'))
+
+    assert numpy_out.forecast_dates == statsmodels_out.forecast_dates
+    np.testing.assert_allclose(numpy_out.forecast_values, statsmodels_out.forecast_values, rtol=0.01)
+
+    # Multiplicative mode falls back to additive for non-positive data
+    flat_zero = make_input(values=[0.0] * 36, seasonality_mode='multiplicative', engine='numpy')
+    assert ForecastEngine.generate_forecast(flat_zero).forecast_values == pytest.approx([0.0] * 12)
+
+# --- Test Model Selection Tournament ---
+
+def test_auto_mode_picks_best_scoring_candidate():
+    output = ForecastEngine.generate_forecast(make_input(n_months=48, seasonality_mode='auto'))
+
+    assert output.selection_metric == 'aic'
+    assert set(output.model_scores) == {"hw_additive", "hw_multiplicative", "hw_additive_damped", "holt", "ets_mam", "arima_111"}
+    assert output.model_name == min(output.model_scores, key=output.model_scores.get)
+    # Strong 12-month seasonality: a non-seasonal model must not win
+    assert output.model_name not in ("holt", "arima_111")
+
+    holdout = ForecastEngine.generate_forecast(make_input(n_months=48, seasonality_mode='auto', selection_metric='holdout'))
+    assert holdout.selection_metric == 'holdout'
+    assert holdout.model_name not in ("holt", "arima_111")
+
+def test_auto_mode_skips_unsupported_candidates_on_short_series():
+    """
+    16 months cannot support seasonal candidates, and leaves no room for holdout windows.
+    """
+    output = ForecastEngine.generate_forecast(make_input(n_months=16, seasonality_mode='auto', selection_metric='holdout'))
+
+    assert set(output.model_scores) == {"holt", "arima_111"}
+    assert output.selection_metric == 'aic'
+    assert len(output.forecast_values) == 12
+
+    with pytest.raises(ValueError):
+        ForecastEngine.generate_forecast(make_input(n_months=3, seasonality_mode='auto'))
+
+# --- Test Simulated Prediction Intervals ---
+
+@pytest.mark.parametrize("engine", ["statsmodels", "numpy"])
+def test_simulated_intervals_widen_with_horizon(engine):
+    output = ForecastEngine.generate_forecast(make_input(periods=24, engine=engine, interval_method='simulated'))
+
+    width = np.array(output.upper_bound) - np.array(output.lower_bound)
+    assert width[-1] > width[0] > 0
+    assert np.all(np.array(output.lower_bound) <= output.forecast_values)
+
+    # Fan chart quantiles are ordered and centred on the point forecast
+    fan = np.array([output.forecast_quantiles[key] for key in ("0.05", "0.25", "0.5", "0.75", "0.95")])
+    assert np.all(np.diff(fan, axis=0) >= 0)
+    np.testing.assert_allclose(fan[2], output.forecast_values, atol=0.5 * width.max())
+
+def test_constant_interval_method_and_quantile_validation():
+    # Default: the constant band, as before simulated intervals existed
+    output = ForecastEngine.generate_forecast(make_input())
+    width = np.array(output.upper_bound) - np.array(output.lower_bound)
+
+    assert output.forecast_quantiles is None
+    np.testing.assert_allclose(width, width[0])
+
+    with pytest.raises(ValueError):
+        make_input(quantiles=[0.5, 1.0])
+
+# --- Test Vectorized Preprocessing ---
+
+def test_preprocess_batch_matches_pandas_resample():
+    """
+    Irregular daily histories: monthly mean, interior gaps interpolated, edges filled.
+    """
+    rng = np.random.default_rng(5)
+    dates_list, values_list, expected = [], [], []
+    for n in (40, 300, 7):
+        days = np.sort(rng.choice(900, n, replace=False))
+        dates = (np.datetime64('2021-01-01') + days).astype(str).tolist()
+        values = rng.normal(100, 10, n)
+        values[0] = np.nan # Leading NaN: first month may end up empty
+        dates_list.append(dates)
+        values_list.append(values.tolist())
+
+        df = pd.DataFrame({'value': values}, index=pd.to_datetime(dates)).resample('MS').mean()
+        expected.append(df['value'].interpolate(method='linear').bfill().ffill())
+
+    for result, reference in zip(ForecastEngine.preprocess_batch(dates_list, values_list), expected):
+        pd.testing.assert_series_equal(result, reference, check_index_type=False, check_freq=True)
+
+    # Unsorted input and non-ISO formats are accepted
+    series = ForecastEngine.preprocess_data(['03/15/2020', '01/10/2020'], [3.0, 1.0])
+    assert series.tolist() == [1.0, 2.0, 3.0]
+
+def test_check_nans_rejects_nan_values():
+    with pytest.raises(ValueError):
+        make_input(values=[1.0, float('nan')] + [1.0] * 34)
+
+# --- Test Model-State Decomposition ---
+
+def test_model_decomposition_reuses_fitted_states():
+    input_data = make_input(decomposition='model')
+    output = ForecastEngine.generate_forecast(input_data)
+    series = ForecastEngine.preprocess_data(input_data.dates, input_data.values)
+    fit = ForecastEngine.get_fitted_model(series, 'additive')
+
+    np.testing.assert_allclose(output.trend, fit.level)
+    np.testing.assert_allclose(output.slope, fit.trend)
+    np.testing.assert_allclose(output.seasonal, fit.season)
+    np.testing.assert_allclose(output.residuals, series - fit.fittedvalues)
+
+def test_classical_decomposition_and_stateless_models():
+    """
+    'classical' runs seasonal_decompose (no NaN edges); ARIMA has no states and falls back to it.
+    """
+    # Default
+    classical = ForecastEngine.generate_forecast(make_input())
+    assert classical.slope is None
+    assert not np.isnan(classical.trend).any()
+    # Sine amplitude 100 is recovered by the classical seasonal component
+    assert max(classical.seasonal) == pytest.approx(100, abs=10)
+
+    short = ForecastEngine.generate_forecast(make_input(n_months=16, seasonality_mode='auto'))
+    assert short.model_name == 'arima_111' and short.slope is None
+    assert len(short.residuals) == len(short.trend) == 16
+
+def test_model_decomposition_multiplicative_and_non_seasonal_fits():
+    """
+    Multiplicative fits report seasonal factors; a non-seasonal fit gets the neutral season of the mode.
+    """
+    output = ForecastEngine.generate_forecast(make_input(seasonality_mode='multiplicative', decomposition='model'))
+    # Factors around 1 (sine amplitude is ~10% of the level), not offsets around 0
+    assert 0.8 < min(output.seasonal) and max(output.seasonal) < 1.2
+    assert np.ptp(output.seasonal) > 0.1
+
+    series = ForecastEngine.preprocess_data(make_input().dates, make_input().values)
+    holt = FORECAST_CANDIDATES['holt'][2](series)
+    _, _, multiplicative = _state_components(holt, 'multiplicative')
+    _, _, additive = _state_components(holt, 'additive')
+    assert (multiplicative == 1.0).all() and (additive == 0.0).all()
+
+    ets = FORECAST_CANDIDATES['ets_mam'][2](series)
+    np.testing.assert_allclose(_state_components(ets, 'multiplicative')[2], ets.season)
@@ -0,0 +1,68 @@
+import pytest
+import numpy as np
+import pandas as pd
+from src.core.hierarchical import HierarchicalForecastEngine
+
+def make_budget_history(n_months=36, seed=0):
+    rng = np.random.default_rng(seed)
+    months = pd.date_range('2021-01-01', periods=n_months, freq='MS')
+    t = np.arange(n_months)
+    rows = []
+    for dept, gl, level in (("Sales", "6000", 500.0), ("Sales", "6100", 200.0), ("R&D", "6000", 800.0)):
+        amounts = level + 2 * t + 0.1 * level * np.sin(2 * np.pi * t / 12) + rng.normal(0, 10, n_months)
+        rows.append(pd.DataFrame({'department': dept, 'gl_code': gl, 'month': months, 'amount': amounts}))
+    return pd.concat(rows, ignore_index=True)
+
+def test_summing_matrix_structure():
+    hierarchy = HierarchicalForecastEngine.build_hierarchy(make_budget_history())
+    S = hierarchy["S"].toarray()
+
+    assert hierarchy["nodes"]["node_id"].tolist() == ["Total", "R&D", "Sales", "R&D | 6000", "Sales | 6000", "Sales | 6100"]
+    np.testing.assert_array_equal(S, [
+        [1, 1, 1],
+        [1, 0, 0],
+        [0, 1, 1],
+        [1, 0, 0],
+        [0, 1, 0],
+        [0, 0, 1]
+    ])
+
+def test_mint_conjugate_gradient_matches_dense_solution():
+    """
+    The matrix-free CG solve equals the closed-form S (S'W^-1 S)^-1 S'W^-1 y^.
+    """
+    rng = np.random.default_rng(1)
+    keys = pd.DataFrame({'department': np.repeat(list("ABCD"), 5), 'gl_code': np.tile(list("vwxyz"), 4)})
+    S = HierarchicalForecastEngine.build_hierarchy(keys)["S"]
+    base = rng.normal(100, 20, (S.shape[0], 3))
+    residuals = rng.normal(0, rng.uniform(1, 5, (S.shape[0], 1)), (S.shape[0], 24))
+
+    reconciled = HierarchicalForecastEngine.reconcile(base, S, "mint", residuals=residuals)
+
+    Sd = S.toarray()
+    W_inv = np.diag(1 / residuals.var(axis=1))
+    expected = Sd @ np.linalg.solve(Sd.T @ W_inv @ Sd, Sd.T @ W_inv @ base)
+    np.testing.assert_allclose(reconciled, expected, rtol=1e-7)
+
+@pytest.mark.parametrize("method", ["bottom_up", "top_down", "ols", "mint"])
+def test_reconciled_forecasts_are_coherent(method):
+    result = HierarchicalForecastEngine.run_hierarchical_forecast(make_budget_history(), horizon=6, method=method, max_workers=1)
+    total = result[result['level'] == 'total'].set_index('month')['forecast']
+    leaves = result[result['level'] == 'gl_code'].groupby('month')['forecast'].sum()
+    np.testing.assert_allclose(total, leaves)
+
+    depts = result[result['level'] == 'department'].groupby(['department', 'month'])['forecast'].sum()
+    leaf_depts = result[result['level'] == 'gl_code'].groupby(['department', 'month'])['forecast'].sum()
+    np.testing.assert_allclose(depts, leaf_depts)
+    assert len(result) == 6 * 6
+
+    if method == "bottom_up":
+        leaf_rows = result[result['level'] == 'gl_code']
+        np.testing.assert_allclose(leaf_rows['forecast'], leaf_rows['base_forecast'])
+
+def test_short_history_falls_back_to_naive_forecast():
+    result = HierarchicalForecastEngine.run_hierarchical_forecast(make_budget_history(n_months=10), horizon=3, max_workers=1)
+    assert result['forecast'].notna().all()
+
+    with pytest.raises(ValueError):
+        HierarchicalForecastEngine.reconcile(np.zeros((6, 1)), np.eye(6, 3), method="middle_out")
@@ -0,0 +1,61 @@
+import pandas as pd
+import numpy as np
+from src.core.etl_engine import SmartImporter
+from src.core.staging_store import StagingStore
+
+def make_cleaned(months=6, rows_per_month=10):
+    dates = pd.date_range('2023-01-01', periods=months, freq='MS').repeat(rows_per_month)
+    return pd.DataFrame({
+        'date': dates,
+        'revenue': np.arange(len(dates)) * 10.0,
+        'cogs': np.arange(len(dates)) * 4.0,
+        'Memo': 'note'
+    })
+
+def test_partitions_and_selective_reads(tmp_path):
+    store = StagingStore(tmp_path)
+    df = make_cleaned()
+    assert store.write(df, 'erp') == ['2023-01', '2023-02', '2023-03', '2023-04', '2023-05', '2023-06']
+    store.write(df.iloc[:10], 'crm')
+
+    partitions = store.partitions()
+    assert len(partitions) == 7
+    assert partitions['rows'].sum() == 70
+
+    subset = store.read('erp', columns=['date', 'revenue'], start='2023-02', end='2023-03')
+    assert list(subset.columns) == ['source', 'period', 'date', 'revenue']
+    expected = df[(df['date'] >= '2023-02-01') & (df['date'] < '2023-04-01')]
+    np.testing.assert_array_equal(np.sort(subset['revenue']), expected['revenue'])
+
+    monthly = store.monthly_series('erp', 'revenue')
+    assert monthly.iloc[0] == df['revenue'].iloc[:10].sum()
+
+def test_streamed_reimport_replaces_months(tmp_path):
+    source = tmp_path / "ledger.csv"
+    pd.DataFrame({
+        'Mnth': pd.date_range('2023-01-01', periods=90, freq='D').strftime('%Y-%m-%d'),
+        'TtL Sales': ['$1,000.00'] * 90
+    }).to_csv(source, index=False)
+
+    store = StagingStore(tmp_path / "store")
+    for _ in range(2):
+        SmartImporter.stream_import(source, store.sink('erp'), chunk_size=25)
+
+    stored = store.read('erp')
+    assert len(stored) == 90, "Re-importing a file must not duplicate rows"
+    assert stored['revenue'].eq(1000.0).all()
+    assert StagingStore(tmp_path / "empty").read(columns=['revenue']).empty
+
+def test_filtered_reads_do_not_open_other_partitions(tmp_path):
+    store = StagingStore(tmp_path)
+    store.write(make_cleaned(months=2), 'erp')
+    crm = make_cleaned(months=1).assign(cogs=np.nan, Memo=None)
+    store.write(crm, 'crm')
+
+    # A damaged file elsewhere in the store must not matter to a pruned read
+    for path in (tmp_path / "source=crm").rglob("*.parquet"):
+        path.write_bytes(b"not parquet")
+
+    stored = store.read('erp', start='2023-02')
+    assert len(stored) == 10
+    assert stored['cogs'].dtype == float